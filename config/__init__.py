@@ -7,38 +7,54 @@ settings.py is optional and can be created from settings.example.py.
 
 import os
 import sys
+import functools
 import importlib.util
 from pathlib import Path
 
 # Get the directory where this __init__.py file is located
 _config_dir = Path(__file__).parent
 
-# Try to import settings, with fallback to settings.example
-try:
+
+@functools.lru_cache(maxsize=1)
+def _load_example_settings():
+    """
+    Load settings.example.py as a module.
+    
+    The result is cached so the example file is executed at most once per process.
+    
+    Returns:
+        The loaded settings example module
+    """
+    # settings.example.py has a dot in the filename, so we need to use importlib
+    example_path = _config_dir / "settings.example.py"
+    if not example_path.exists():
+        raise ImportError("settings.example.py not found")
+    spec = importlib.util.spec_from_file_location("settings_example", example_path)
+    if not (spec and spec.loader):
+        raise ImportError("Could not load settings.example.py")
+    settings_example = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(settings_example)
+    return settings_example
+
+
+# Probe for settings.py instead of attempting the import, so the common
+# case never goes through exception handling
+if importlib.util.find_spec(f"{__name__}.settings") is not None:
     from . import settings
-except ImportError:
+else:
     try:
         # If settings.py doesn't exist, try to load settings.example.py
-        # Note: settings.example.py has a dot in the filename, so we need to use importlib
-        example_path = _config_dir / "settings.example.py"
-        if example_path.exists():
-            spec = importlib.util.spec_from_file_location("settings_example", example_path)
-            if spec and spec.loader:
-                settings_example = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(settings_example)
-                settings = settings_example
-                # Warn that example settings are being used
-                import warnings
-                warnings.warn(
-                    "config/settings.py not found. Using example settings.",
-                    UserWarning
-                )
-            else:
-                raise ImportError("Could not load settings.example.py")
-        else:
-            raise ImportError("settings.example.py not found")
-    except (ImportError, Exception) as e:
-        # If neither exists, create a minimal settings object
+        settings = _load_example_settings()
+        # Register it so later `import config.settings` resolves directly
+        sys.modules[f"{__name__}.settings"] = settings
+        # Warn that example settings are being used
+        import warnings
+        warnings.warn(
+            "config/settings.py not found. Using example settings.",
+            UserWarning
+        )
+    except (ImportError, OSError, SyntaxError, AttributeError) as e:
+        # If neither exists (or the example can't be loaded), create a minimal settings object
         class MinimalSettings:
             """Minimal settings object when no config file is available."""
             pass
@@ -9,67 +9,97 @@ Usage:
     python scripts/collect_missed_dates.py --start-date 2025-01-01 --end-date 2025-12-31
     python scripts/collect_missed_dates.py --start-date 2025-01-01 --end-date 2025-12-31 --check-raw-only
     python scripts/collect_missed_dates.py --start-date 2025-01-01 --end-date 2025-12-31 --check-processed-only
+    python scripts/collect_missed_dates.py --start-date 2025-01-01 --end-date 2025-12-31 --workers 4 --delay 0.05
 """
 
 import sys
 import os
 import argparse
-from datetime import datetime, timedelta
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+import threading
 import time
+import traceback
 
-# Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add project root to path (once, even when imported from another script)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-from src.currency_collector import collect_historical_data_for_date
+from src.currency_collector import collect_historical_data_for_date, MAX_CONCURRENT_DATES
 from src.currency_storage import save_raw_data, save_daily_data, save_to_currency_table
 from src.currency_formatter import standardize_data
+from src.base_storage import encode_json
 
+# Data directories (relative to the project root the script is run from)
+_RAW_DIR = Path("data/forex_data/raw")
+_PROCESSED_DIR = Path("data/forex_data/processed")
 
-def get_existing_dates(data_dir: str, file_prefix: str) -> set:
+
+def get_existing_dates(data_dir: Path, file_prefix: str,
+                       start_date: Optional[str] = None, end_date: Optional[str] = None) -> set:
     """
     Get set of dates that already have data files.
     
     Args:
-        data_dir: Directory to check (e.g., "data/forex_data/raw" or "data/forex_data/processed")
+        data_dir: Directory to check (e.g., _RAW_DIR or _PROCESSED_DIR)
         file_prefix: Prefix of files to check (e.g., "aud_data_" or "aud_daily_")
+        start_date: Optional first date to include (YYYY-MM-DD); earlier dates are skipped
+        end_date: Optional last date to include (YYYY-MM-DD); later dates are skipped
         
     Returns:
         Set of date strings in YYYY-MM-DD format
     """
     existing_dates = set()
     
-    if not os.path.exists(data_dir):
+    # Single directory scan; only filenames are needed (no Path objects or stat calls)
+    try:
+        with os.scandir(data_dir) as it:
+            filenames = [entry.name for entry in it
+                         if entry.name.startswith(file_prefix) and entry.name.endswith(".json")]
+    except FileNotFoundError:
         return existing_dates
     
+    # Filenames have a fixed layout, so dates are sliced at fixed offsets
+    # (invalid dates never match the calendar range they are compared against).
+    # YYYY-MM-DD strings order like dates, so the range filter is a string comparison.
+    low = start_date or ""
+    high = end_date or "9999-12-31"
+    
     # For raw data: files are like "aud_data_20250101_120000.json"
-    # Extract date from timestamp
     if file_prefix == "aud_data_":
-        for filepath in Path(data_dir).glob("aud_data_*.json"):
-            # Extract date from filename: aud_data_YYYYMMDD_HHMMSS.json
-            filename = filepath.stem
-            try:
-                date_part = filename.split("_")[2]  # Get YYYYMMDD part
-                date_obj = datetime.strptime(date_part, "%Y%m%d")
-                existing_dates.add(date_obj.strftime("%Y-%m-%d"))
-            except (IndexError, ValueError):
-                continue
+        for name in filenames:
+            # aud_data_YYYYMMDD_HHMMSS.json -> YYYYMMDD at [9:17]
+            date_part = name[9:17]
+            if len(name) == 29 and date_part.isdigit():
+                date_str = f"{date_part[0:4]}-{date_part[4:6]}-{date_part[6:8]}"
+                if low <= date_str <= high:
+                    existing_dates.add(date_str)
     
     # For processed data: files are like "aud_daily_2025-01-01.json"
     elif file_prefix == "aud_daily_":
-        for filepath in Path(data_dir).glob("aud_daily_*.json"):
-            # Extract date from filename: aud_daily_YYYY-MM-DD.json
-            filename = filepath.stem
-            try:
-                date_part = filename.replace("aud_daily_", "")
-                date_obj = datetime.strptime(date_part, "%Y-%m-%d")
-                existing_dates.add(date_obj.strftime("%Y-%m-%d"))
-            except ValueError:
-                continue
+        for name in filenames:
+            # aud_daily_YYYY-MM-DD.json -> YYYY-MM-DD at [10:20]
+            date_part = name[10:20]
+            if (len(name) == 25 and date_part[4] == date_part[7] == "-"
+                    and (date_part[0:4] + date_part[5:7] + date_part[8:10]).isdigit()
+                    and low <= date_part <= high):
+                existing_dates.add(date_part)
     
     return existing_dates
 
 
+def _to_ordinals(date_strs: set) -> Iterator[int]:
+    """Yield day ordinals for YYYY-MM-DD strings, skipping invalid calendar dates."""
+    for date_str in date_strs:
+        try:
+            yield date.fromisoformat(date_str).toordinal()
+        except ValueError:
+            continue
+
+
 def get_missed_dates(start_date: str, end_date: str, 
                      check_raw: bool = True, check_processed: bool = True) -> list:
     """
@@ -87,32 +117,64 @@ def get_missed_dates(start_date: str, end_date: str,
     start = datetime.strptime(start_date, "%Y-%m-%d")
     end = datetime.strptime(end_date, "%Y-%m-%d")
     
-    # Get all dates in range
-    all_dates = set()
-    current = start
-    while current <= end:
-        all_dates.add(current.strftime("%Y-%m-%d"))
-        current += timedelta(days=1)
+    start_ordinal = start.toordinal()
+    end_ordinal = end.toordinal()
+    range_size = end_ordinal - start_ordinal + 1
     
-    # Get existing dates
-    existing_dates = set()
+    # Range bounds normalized to zero-padded YYYY-MM-DD
+    range_start = start.date().isoformat()
+    range_end = end.date().isoformat()
     
+    sources = []
     if check_raw:
-        raw_dates = get_existing_dates("data/forex_data/raw", "aud_data_")
-        existing_dates.update(raw_dates)
-    
+        sources.append((_RAW_DIR, "aud_data_"))
     if check_processed:
-        processed_dates = get_existing_dates("data/forex_data/processed", "aud_daily_")
-        existing_dates.update(processed_dates)
+        sources.append((_PROCESSED_DIR, "aud_daily_"))
+    
+    # Start from every date in range as day ordinals and strip out the ones
+    # already on disk (formatted back to strings only for the missed ones)
+    missed_ordinals = None
+    for data_dir, file_prefix in sources:
+        existing_ordinals = set(_to_ordinals(
+            get_existing_dates(data_dir, file_prefix, range_start, range_end)))
+        # Existing dates are limited to the range, so a full count means full coverage
+        if len(existing_ordinals) == range_size:
+            return []
+        if missed_ordinals is None:
+            missed_ordinals = set(range(start_ordinal, end_ordinal + 1))
+        missed_ordinals.difference_update(existing_ordinals)
+    
+    if missed_ordinals is None:
+        missed_ordinals = range(start_ordinal, end_ordinal + 1)
     
     # Find missed dates
-    missed_dates = sorted(all_dates - existing_dates)
+    missed_dates = [date.fromordinal(ordinal).isoformat()
+                    for ordinal in sorted(missed_ordinals)]
     
     return missed_dates
 
 
+class RateLimiter:
+    """Thread-safe limiter spacing successive calls (API requests) at least `interval` seconds apart."""
+    
+    def __init__(self, interval: float):
+        self.interval = max(0.0, interval)
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+    
+    def wait(self) -> None:
+        """Block until the caller's slot is reached."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 def collect_data_for_date(date: str, save_raw: bool = True, 
-                         save_processed: bool = True, save_csv: bool = True) -> bool:
+                         save_processed: bool = True, save_csv: bool = True,
+                         raw_data: Optional[Dict[str, Any]] = None) -> bool:
     """
     Collect and save data for a specific date.
     
@@ -121,6 +183,7 @@ def collect_data_for_date(date: str, save_raw: bool = True,
         save_raw: Whether to save raw data JSON
         save_processed: Whether to save processed data JSON
         save_csv: Whether to save to CSV table
+        raw_data: Already collected data for the date (skips the API call)
         
     Returns:
         True if successful, False otherwise
@@ -129,7 +192,8 @@ def collect_data_for_date(date: str, save_raw: bool = True,
         print(f"\nCollecting data for {date}...")
         
         # Collect historical data
-        raw_data = collect_historical_data_for_date(date)
+        if raw_data is None:
+            raw_data = collect_historical_data_for_date(date)
         
         # Check if we got any currency data
         currencies = raw_data.get("currencies", {}).get("currencies", {})
@@ -139,18 +203,19 @@ def collect_data_for_date(date: str, save_raw: bool = True,
         
         # Save raw data
         if save_raw:
-            save_raw_data(raw_data, output_dir="data/forex_data/raw")
+            save_raw_data(raw_data, output_dir=str(_RAW_DIR))
         
         # Standardize and save processed data
         if save_processed or save_csv:
             standardized_data = standardize_data(raw_data)
             
             if save_processed:
-                save_daily_data(standardized_data, output_dir="data/forex_data/processed")
+                save_daily_data(standardized_data, output_dir=str(_PROCESSED_DIR),
+                                encoded=encode_json(standardized_data))
             
             if save_csv:
                 try:
-                    save_to_currency_table(standardized_data)
+                    save_to_currency_table(standardized_data, already_standardized=True)
                 except Exception as e:
                     print(f"  ⚠ Warning: Error saving to CSV: {e}")
         
@@ -159,7 +224,6 @@ def collect_data_for_date(date: str, save_raw: bool = True,
         
     except Exception as e:
         print(f"  ✗ Error collecting data for {date}: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -209,8 +273,14 @@ def main():
     parser.add_argument(
         "--delay",
         type=float,
-        default=0.5,
-        help="Delay between API calls in seconds (default: 0.5)"
+        default=0.1,
+        help="Minimum delay between API requests in seconds, across all workers (default: 0.1)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help=f"Number of dates fetched concurrently (default: 4, max: {MAX_CONCURRENT_DATES})"
     )
     
     args = parser.parse_args()
@@ -272,24 +342,47 @@ def main():
     successful = 0
     failed = 0
     
-    for i, date in enumerate(missed_dates, 1):
-        print(f"\n[{i}/{len(missed_dates)}] Processing {date}...")
-        
-        success = collect_data_for_date(
-            date,
-            save_raw=not args.skip_raw,
-            save_processed=not args.skip_processed,
-            save_csv=not args.skip_csv
-        )
-        
-        if success:
-            successful += 1
-        else:
-            failed += 1
+    # Fetch dates concurrently (network-bound). Every HTTP request, including each
+    # date's per-currency requests, is spaced by --delay. Results are saved on this
+    # thread in date order, so JSON/CSV writes never overlap and each new CSV row
+    # is a plain append rather than a full rewrite.
+    rate_limiter = RateLimiter(args.delay)
+    
+    # Each date issues one request per currency at once; more workers than this
+    # would overflow the shared session's connection pool
+    workers = min(max(1, args.workers), MAX_CONCURRENT_DATES)
+    if workers < args.workers:
+        print(f"⚠ Limiting --workers to {workers} (HTTP connection pool size)")
+    
+    def fetch(date):
+        return collect_historical_data_for_date(date, throttle=rate_limiter.wait)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [(date, executor.submit(fetch, date)) for date in sorted(missed_dates)]
         
-        # Add delay to respect API rate limits
-        if i < len(missed_dates) and args.delay > 0:
-            time.sleep(args.delay)
+        for i, (date, future) in enumerate(futures, 1):
+            print(f"\n[{i}/{len(missed_dates)}] Processing {date}...")
+            
+            try:
+                raw_data = future.result()
+            except Exception as e:
+                print(f"  ✗ Error collecting data for {date}: {e}")
+                traceback.print_exc()
+                failed += 1
+                continue
+            
+            success = collect_data_for_date(
+                date,
+                save_raw=not args.skip_raw,
+                save_processed=not args.skip_processed,
+                save_csv=not args.skip_csv,
+                raw_data=raw_data
+            )
+            
+            if success:
+                successful += 1
+            else:
+                failed += 1
     
     # Summary
     print("\n" + "=" * 70)
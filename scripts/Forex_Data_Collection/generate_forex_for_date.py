@@ -4,45 +4,182 @@ Generate Forex HTML for a specific date
 
 Usage:
     python scripts/generate_forex_for_date.py 2025-12-30
+    python scripts/generate_forex_for_date.py 2025-12-29 2025-12-30
+    python scripts/generate_forex_for_date.py --start-date 2025-12-01 --end-date 2025-12-31
+
+Multiple dates are processed in one process, reusing the RBA importer.
 """
 
 import sys
 import os
-from datetime import datetime
+import re
+import argparse
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 
-# Add project root to path
-project_root = os.path.join(os.path.dirname(__file__), '..', '..')
-sys.path.insert(0, os.path.abspath(project_root))
+# Add project root to path (once, even when imported from another script)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from scripts.generate_forex_html import generate_forex_html
+from scripts.html_utils import browser_session
 from src.currency_collector import collect_historical_data_for_date
 from src.currency_formatter import standardize_data
 from src.currency_storage import save_daily_data, save_to_currency_table
+from src.base_storage import encode_json
 from src.rba_historical_importer import RBAForexImporter
+from scripts.update_utils import TEMPLATES_DIR
+
+_TEMPLATE_PATH = TEMPLATES_DIR / 'forex_template.html'
+
+
+# Strict YYYY-MM-DD (date.fromisoformat alone also accepts other ISO forms on 3.11+)
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+CURRENCIES_TO_FETCH = ("USD", "EUR", "CNY", "SGD", "JPY")
+
+# Shared importer, created on first use
+_IMPORTER = None
+
+# Bitset of past dates for which neither RBA nor the API had data (weekends,
+# holidays), one bit per day since _EMPTY_DATES_EPOCH. A date is only recorded when
+# the imported RBA data covers it and every API request answered; entries are
+# ignored and cleared once RBA data for the date is imported. Delete the file to reset.
+_EMPTY_DATES_PATH = os.path.join("data", "forex_data", "historical", "rba_empty_dates.bin")
+_EMPTY_DATES_EPOCH = date(1983, 1, 1)
+# Only dates at least this old are recorded, since recent data may still be published
+_EMPTY_DATES_MIN_AGE_DAYS = 7
+_empty_dates = None
+
+
+def _get_importer():
+    """Return the shared RBAForexImporter instance."""
+    global _IMPORTER
+    if _IMPORTER is None:
+        _IMPORTER = RBAForexImporter()
+    return _IMPORTER
+
+
+@lru_cache(maxsize=512)
+def _query_rba_rates(date_str, currencies, base="AUD"):
+    """Query RBA rates for one date (memoized; returns a read-only tuple of items)."""
+    return tuple(_get_importer().query_rates_batch(date_str, currencies, base).items())
+
+
+@lru_cache(maxsize=1)
+def _rba_covered_range():
+    """First and last imported RBA dates (YYYY-MM-DD), or None if nothing is imported."""
+    return _get_importer().get_covered_range()
+
+
+def rba_covers_date(date_str):
+    """
+    Check whether the imported RBA data spans a date, so a missing row means
+    RBA had no rates for it (rather than the data not being imported yet).
+    
+    Args:
+        date_str: Date in YYYY-MM-DD format
+        
+    Returns:
+        True if the date lies within the imported RBA date range
+    """
+    covered = _rba_covered_range()
+    return covered is not None and covered[0] <= date_str <= covered[1]
+
+
+def _load_empty_dates():
+    """Load the known-empty dates bitset (once per process)."""
+    global _empty_dates
+    if _empty_dates is None:
+        try:
+            with open(_EMPTY_DATES_PATH, 'rb') as f:
+                _empty_dates = bytearray(f.read())
+        except FileNotFoundError:
+            _empty_dates = bytearray()
+    return _empty_dates
+
+
+def is_known_empty_date(day):
+    """
+    Check whether a date was previously found to have no data from any source.
+    
+    Args:
+        day: date object
+        
+    Returns:
+        True if the date is recorded as empty, False otherwise
+    """
+    index = (day - _EMPTY_DATES_EPOCH).days
+    bits = _load_empty_dates()
+    if index < 0 or index // 8 >= len(bits):
+        return False
+    return bool(bits[index // 8] & (1 << (index % 8)))
+
+
+def mark_empty_date(day):
+    """
+    Record that a date has no data from RBA or the API.
+    
+    Recent dates are not recorded because their data may still be published.
+    
+    Args:
+        day: date object
+    """
+    index = (day - _EMPTY_DATES_EPOCH).days
+    if index < 0 or (date.today() - day).days < _EMPTY_DATES_MIN_AGE_DAYS:
+        return
+    
+    bits = _load_empty_dates()
+    if index // 8 >= len(bits):
+        bits.extend(bytes(index // 8 + 1 - len(bits)))
+    bits[index // 8] |= 1 << (index % 8)
+    _save_empty_dates(bits)
+
+
+def clear_empty_date(day):
+    """
+    Remove a date from the known-empty dates (e.g. once RBA data for it was imported).
+    
+    Args:
+        day: date object
+    """
+    if not is_known_empty_date(day):
+        return
+    
+    index = (day - _EMPTY_DATES_EPOCH).days
+    bits = _load_empty_dates()
+    bits[index // 8] &= ~(1 << (index % 8))
+    _save_empty_dates(bits)
+
+
+def _save_empty_dates(bits):
+    """Write the known-empty dates bitset."""
+    os.makedirs(os.path.dirname(_EMPTY_DATES_PATH), exist_ok=True)
+    with open(_EMPTY_DATES_PATH, 'wb') as f:
+        f.write(bits)
 
 
 def get_data_from_rba(date_str):
     """Try to get currency data from RBA database"""
-    importer = RBAForexImporter()
     currencies_data = {
         "timestamp": datetime.now().isoformat(),
         "currencies": {}
     }
     
-    currencies_to_fetch = ["USD", "EUR", "CNY", "SGD", "JPY"]
-    found_any = False
+    rates = dict(_query_rba_rates(date_str, CURRENCIES_TO_FETCH))
     
-    for currency in currencies_to_fetch:
-        rate = importer.query_rate(date_str, currency, "AUD")
+    for currency in CURRENCIES_TO_FETCH:
+        rate = rates.get(currency)
         if rate:
             currencies_data["currencies"][currency] = {
                 "rate": rate,
                 "base": "AUD",
                 "date": date_str
             }
-            found_any = True
     
-    if found_any:
+    if currencies_data["currencies"]:
         return {
             "collection_date": datetime.now().isoformat(),
             "currencies": currencies_data
@@ -50,25 +187,54 @@ def get_data_from_rba(date_str):
     return None
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/generate_forex_for_date.py YYYY-MM-DD")
-        sys.exit(1)
+def parse_date_arg(date_str):
+    """
+    Validate a YYYY-MM-DD date string.
     
-    date_str = sys.argv[1]
-    
-    # Validate date format
+    Args:
+        date_str: Date string to validate
+        
+    Returns:
+        date object
+        
+    Raises:
+        argparse.ArgumentTypeError: If the date is not a valid YYYY-MM-DD date
+    """
     try:
-        datetime.strptime(date_str, "%Y-%m-%d")
+        if not _DATE_RE.fullmatch(date_str):
+            raise ValueError(date_str)
+        return date.fromisoformat(date_str)
     except ValueError:
-        print(f"Error: Invalid date format. Use YYYY-MM-DD (e.g., 2025-12-30)")
-        sys.exit(1)
+        raise argparse.ArgumentTypeError(
+            f"Invalid date format: {date_str}. Use YYYY-MM-DD (e.g., 2025-12-30)"
+        )
+
+
+def generate_for_date(date_str, browser=None):
+    """
+    Collect, save and render forex data for a single date.
     
-    print(f'Fetching historical data for {date_str}...')
+    Args:
+        date_str: Date in YYYY-MM-DD format
+        browser: Optional open browser from html_utils.browser_session, reused for the JPEG
+        
+    Returns:
+        True if data was found and saved, False otherwise
+    """
+    day = date.fromisoformat(date_str)
     
-    # Try RBA database first
+    # Try RBA database first (local, so it is checked even for known-empty dates)
     historical_data = get_data_from_rba(date_str)
     
+    if historical_data and historical_data.get('currencies', {}).get('currencies'):
+        # RBA data may have been imported since the date was recorded as empty
+        clear_empty_date(day)
+    elif is_known_empty_date(day):
+        print(f"Skipping {date_str}: previously found no data from RBA or the API")
+        return False
+    
+    print(f'Fetching historical data for {date_str}...')
+    
     # If RBA doesn't have it, try API
     if not historical_data or not historical_data.get('currencies', {}).get('currencies'):
         print("RBA database doesn't have data, trying API...")
@@ -85,29 +251,94 @@ def main():
     
     # Check if we got any data
     if not standardized.get('currencies'):
+        # Only remember the date if both sources really answered with no data:
+        # RBA's imported range covers it and no API request errored
+        if rba_covers_date(date_str) and not historical_data.get('failed_currencies'):
+            mark_empty_date(day)
         print(f"Warning: No currency data found for {date_str}")
         print("This might be because:")
         print("  - The date is in the future")
         print("  - The date is a weekend/holiday")
         print("  - The API doesn't have data for this date")
-        sys.exit(1)
+        return False
     
     print(f'Data collected for currencies: {list(standardized.get("currencies", {}).keys())}')
     
     # Save processed data (date-based JSON file)
     print("Saving processed data...")
-    save_daily_data(standardized, output_dir="data/forex_data/processed")
+    # Already standardized: pass the encoded payload so it isn't standardized again
+    save_daily_data(standardized, output_dir="data/forex_data/processed", encoded=encode_json(standardized))
     
     # Save to currency history table (CSV)
     print("Updating currency history table (CSV)...")
-    save_to_currency_table(standardized)
+    save_to_currency_table(standardized, already_standardized=True)
     
     # Generate the output - always use HTML template
-    template_path = 'templates/forex_template.html'
-    html_path, jpeg_path = generate_forex_html(template_path, 'data/forex_data', standardized)
+    html_path, jpeg_path = generate_forex_html(str(_TEMPLATE_PATH), 'data/forex_data', standardized,
+                                               browser=browser)
     print(f'✓ Successfully generated HTML: {html_path}')
     if jpeg_path:
         print(f'✓ Successfully generated JPEG: {jpeg_path}')
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate forex data and HTML/JPEG for one or more dates"
+    )
+    parser.add_argument(
+        "dates",
+        nargs="*",
+        type=parse_date_arg,
+        help="Dates to generate (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--start-date",
+        type=parse_date_arg,
+        help="Start of a date range to generate (YYYY-MM-DD, inclusive)"
+    )
+    parser.add_argument(
+        "--end-date",
+        type=parse_date_arg,
+        help="End of a date range to generate (YYYY-MM-DD, inclusive, default: start date)"
+    )
+    args = parser.parse_args()
+    
+    dates = list(args.dates)
+    if args.start_date:
+        end = args.end_date or args.start_date
+        if end < args.start_date:
+            parser.error("--end-date must not be before --start-date")
+        dates.extend(args.start_date + timedelta(days=offset)
+                     for offset in range((end - args.start_date).days + 1))
+    elif args.end_date:
+        parser.error("--end-date requires --start-date")
+    
+    if not dates:
+        parser.print_usage()
+        sys.exit(1)
+    
+    # Drop repeated dates (e.g. listed and also inside the range), keeping order
+    dates = list(dict.fromkeys(dates))
+    
+    # Process every date in this process so the importer, imports and (for
+    # several dates) one headless browser are reused
+    failed = []
+    with (browser_session() if len(dates) > 1 else nullcontext()) as browser:
+        for day in dates:
+            date_str = day.isoformat()
+            if not generate_for_date(date_str, browser=browser):
+                failed.append(date_str)
+            if len(dates) > 1:
+                print()
+    
+    if len(dates) > 1:
+        print(f"Generated {len(dates) - len(failed)}/{len(dates)} date(s)")
+        if failed:
+            print(f"⚠ No data for: {', '.join(failed)}")
+    
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
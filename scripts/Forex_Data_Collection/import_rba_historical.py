@@ -13,8 +13,10 @@ import sys
 import os
 import logging
 
-# Add parent directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add project root to path (once, even when imported from another script)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.rba_historical_importer import RBAForexImporter
 
@@ -9,11 +9,27 @@ Files are sorted by timestamp (most recent first) and older files are deleted.
 import os
 import sys
 from pathlib import Path
-from collections import defaultdict
+from typing import Optional, Sequence
+from collections import Counter
+from operator import itemgetter
 import re
 
-# Add parent directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add project root to path (once, even when imported from another script)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.update_utils import write_lines
+
+# Raw data directories to clean (resolved once at import)
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_RAW_DIRS = (
+    _PROJECT_ROOT / "data" / "forex_data" / "raw",
+    _PROJECT_ROOT / "data" / "commodities_data" / "raw",
+)
+
+# Raw filename pattern: prefix_YYYYMMDD_HHMMSS.json
+_FILENAME_RE = re.compile(r'(.+)_(\d{8})_(\d{6})\.json')
 
 
 def extract_date_and_timestamp(filename: str) -> tuple:
@@ -27,9 +43,7 @@ def extract_date_and_timestamp(filename: str) -> tuple:
     Returns:
         Tuple of (date_str, full_timestamp_str) or (None, None) if pattern doesn't match
     """
-    # Match pattern: prefix_YYYYMMDD_HHMMSS.json
-    pattern = r'(.+)_(\d{8})_(\d{6})\.json'
-    match = re.match(pattern, filename)
+    match = _FILENAME_RE.match(filename)
     
     if match:
         prefix = match.group(1)
@@ -41,26 +55,20 @@ def extract_date_and_timestamp(filename: str) -> tuple:
     return None, None
 
 
-def cleanup_raw_files(verbose: bool = False) -> dict:
+def cleanup_raw_files(verbose: bool = False, raw_dirs: Optional[Sequence] = None) -> dict:
     """
     Clean up raw files for both forex and commodities data.
     Keeps only a maximum of 2 raw JSON files per date.
     
     Args:
         verbose: Whether to print detailed cleanup messages (default: False)
+        raw_dirs: Raw directories to clean (default: both forex and commodities).
+            Concurrent pipelines pass only their own directory so they never
+            delete files in a directory the other pipeline is scanning.
         
     Returns:
         Dictionary with cleanup statistics
     """
-    # Get project root directory
-    project_root = Path(__file__).parent.parent
-    
-    # Define directories to clean
-    directories = [
-        project_root / "data" / "forex_data" / "raw",
-        project_root / "data" / "commodities_data" / "raw"
-    ]
-    
     if verbose:
         print("\n" + "=" * 60)
         print("Raw Files Cleanup")
@@ -69,7 +77,7 @@ def cleanup_raw_files(verbose: bool = False) -> dict:
     
     all_stats = []
     
-    for raw_dir in directories:
+    for raw_dir in (_RAW_DIRS if raw_dirs is None else [Path(raw_dir) for raw_dir in raw_dirs]):
         if verbose:
             print(f"\nProcessing: {raw_dir}")
             print("-" * 60)
@@ -132,54 +140,88 @@ def cleanup_directory(raw_dir: Path, max_files_per_date: int = 2, verbose: bool
             'dates_processed': 0
         }
     
-    # Group files by date
-    files_by_date = defaultdict(list)
+    # Find all JSON files in a single directory scan. Ordering comes from the
+    # timestamp embedded in the filename, so no per-file stat() is needed.
+    with os.scandir(raw_dir) as it:
+        json_files = [entry for entry in it if entry.name.endswith(".json") and entry.is_file()]
     
-    # Find all JSON files
-    json_files = list(raw_dir.glob("*.json"))
+    # Verbose output is buffered and written once at the end
+    report_lines = []
     
-    for filepath in json_files:
-        date_str, timestamp = extract_date_and_timestamp(filepath.name)
+    # Flat list of (date, timestamp, entry) instead of per-date groups
+    parsed_files = []
+    for entry in json_files:
+        date_str, timestamp = extract_date_and_timestamp(entry.name)
         if date_str and timestamp:
-            files_by_date[date_str].append((filepath, timestamp))
+            parsed_files.append((date_str, timestamp, entry))
         else:
             if verbose:
-                print(f"Warning: Could not parse filename: {filepath.name}")
+                report_lines.append(f"Warning: Could not parse filename: {entry.name}")
+    
+    # Dates already within the limit need no sorting or deletion (the steady state)
+    files_per_date = Counter(date_str for date_str, _, _ in parsed_files)
+    within_limit = [count for count in files_per_date.values() if count <= max_files_per_date]
     
-    # Sort files by date, then by timestamp (most recent first)
     stats = {
         'directory': str(raw_dir),
         'total_files': len(json_files),
-        'files_kept': 0,
+        'files_kept': sum(within_limit),
         'files_deleted': 0,
-        'dates_processed': len(files_by_date)
+        'dates_processed': len(within_limit)
     }
     
-    # Process each date
-    for date_str, file_list in sorted(files_by_date.items()):
-        # Sort by timestamp (descending - most recent first)
-        file_list.sort(key=lambda x: x[1], reverse=True)
+    # One sort of the over-limit dates only, by date then timestamp (most recent first)
+    parsed_files = [item for item in parsed_files if files_per_date[item[0]] > max_files_per_date]
+    parsed_files.sort(key=itemgetter(0, 1), reverse=True)
+    
+    # Walk the sorted list, keeping the first max_files_per_date files of each date.
+    # Per-date summaries are presentation only, so they're collected only when verbose.
+    files_to_delete = []
+    date_summaries = []
+    current_date = None
+    kept_for_date = 0
+    deleted_for_date = 0
+    for date_str, _, entry in parsed_files:
+        if date_str != current_date:
+            if deleted_for_date and verbose:
+                date_summaries.append((current_date, kept_for_date, deleted_for_date))
+            current_date = date_str
+            kept_for_date = 0
+            deleted_for_date = 0
+            stats['dates_processed'] += 1
         
-        # Keep only the most recent max_files_per_date files
-        files_to_keep = file_list[:max_files_per_date]
-        files_to_delete = file_list[max_files_per_date:]
-        
-        # Delete older files
-        for filepath, _ in files_to_delete:
-            try:
-                filepath.unlink()
-                stats['files_deleted'] += 1
-                if verbose:
-                    print(f"Deleted: {filepath.name}")
-            except Exception as e:
-                if verbose:
-                    print(f"Error deleting {filepath.name}: {e}")
-        
-        # Count kept files
-        stats['files_kept'] += len(files_to_keep)
-        
-        if files_to_delete and verbose:
-            print(f"Date {date_str}: Kept {len(files_to_keep)}, Deleted {len(files_to_delete)}")
+        if kept_for_date < max_files_per_date:
+            kept_for_date += 1
+            stats['files_kept'] += 1
+        else:
+            deleted_for_date += 1
+            files_to_delete.append(entry)
+    
+    if deleted_for_date and verbose:
+        date_summaries.append((current_date, kept_for_date, deleted_for_date))
+    
+    # Delete older files in one tight pass; reporting is deferred until after
+    errors = []
+    unlink = os.unlink
+    for entry in files_to_delete:
+        try:
+            unlink(entry.path)
+        except OSError as e:
+            errors.append((entry, e))
+    stats['files_deleted'] = len(files_to_delete) - len(errors)
+    
+    if verbose:
+        failed = {entry.name for entry, _ in errors}
+        for entry in files_to_delete:
+            if entry.name not in failed:
+                report_lines.append(f"Deleted: {entry.name}")
+        for entry, e in errors:
+            report_lines.append(f"Error deleting {entry.name}: {e}")
+        # Report dates oldest first
+        for date_str, kept, deleted in sorted(date_summaries):
+            report_lines.append(f"Date {date_str}: Kept {kept}, Deleted {deleted}")
+        if report_lines:
+            write_lines(*report_lines)
     
     return stats
 
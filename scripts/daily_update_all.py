@@ -14,102 +14,103 @@ Designed to run at 5pm Cairns time (AEST - UTC+10) for COB updates.
 
 import sys
 import os
-from datetime import datetime
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Add project root to path
+# Add project root to path (once, even when imported from another script)
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.insert(0, project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Import update utilities
-try:
-    from scripts.update_utils import get_cairns_time, is_cob_time
-except ImportError:
-    try:
-        from update_utils import get_cairns_time, is_cob_time
-    except ImportError:
-        # Fallback - define minimal versions if update_utils not available
-        def get_cairns_time():
-            from datetime import timezone, timedelta
-            return datetime.now(timezone(timedelta(hours=10)))
-        
-        def is_cob_time():
-            return False
+from scripts.update_utils import get_cairns_time, is_cob_time, write_lines
 
+_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+_FOREX_SCRIPT = os.path.join(_SCRIPTS_DIR, "Forex_Data_Collection", "daily_update.py")
+_COMMODITIES_SCRIPT = os.path.join(_SCRIPTS_DIR, "Mineral_Commodities_Data_Collection", "daily_update.py")
 
-def run_forex_update():
-    """Run forex data collection and generation."""
-    print("\n" + "=" * 70)
-    print("FOREX DATA COLLECTION")
-    print("=" * 70)
+# Serializes prefixed lines from the concurrently running pipelines
+_output_lock = threading.Lock()
+
+
+def _write_prefixed(label, lines):
+    """Write whole lines prefixed with [label] in one locked write."""
+    with _output_lock:
+        write_lines(*(f"[{label}] {line}" for line in lines))
+
+
+def _run_pipeline(label, title, script_path):
+    """
+    Run a daily update script in a child process, relaying its output with a [label] prefix.
     
-    try:
-        # Import forex update function
-        from scripts.Forex_Data_Collection.daily_update import main as forex_main
-        
-        # Run forex collection (may call sys.exit, so catch SystemExit)
-        try:
-            forex_main()
-            return True, None
-        except SystemExit as e:
-            # Script called sys.exit() - check exit code
-            if e.code == 0:
-                return True, None
-            else:
-                return False, f"Forex update exited with code {e.code}"
+    Each pipeline gets its own interpreter, so its stdout/stderr (including output
+    from library threads), sys.exit calls and crashes stay separate from the other
+    pipeline without replacing this process's streams.
+    
+    Args:
+        label: Output prefix (e.g. "forex")
+        title: Banner title printed before the pipeline output
+        script_path: Path to the pipeline's daily_update.py
         
-    except Exception as e:
-        error_msg = f"Forex update failed: {e}"
-        print(f"\n❌ {error_msg}")
-        import traceback
-        traceback.print_exc()
+    Returns:
+        Tuple of (success, error message or None)
+    """
+    _write_prefixed(label, ["", "=" * 70, title, "=" * 70])
+    
+    # Unbuffered UTF-8 child output so lines arrive promptly and ✓/⚠ survive a pipe
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    try:
+        process = subprocess.Popen(
+            [sys.executable, "-u", script_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=env,
+            encoding="utf-8",
+            errors="replace",
+        )
+    except OSError as e:
+        error_msg = f"{title.title()} failed to start: {e}"
+        _write_prefixed(label, [f"❌ {error_msg}"])
         return False, error_msg
+    
+    with process.stdout:
+        for line in process.stdout:
+            _write_prefixed(label, [line.rstrip("\n")])
+    
+    return_code = process.wait()
+    if return_code == 0:
+        return True, None
+    return False, f"{label.title()} update exited with code {return_code}"
+
+
+def run_forex_update():
+    """Run forex data collection and generation."""
+    return _run_pipeline("forex", "FOREX DATA COLLECTION", _FOREX_SCRIPT)
 
 
 def run_commodities_update():
     """Run commodities data collection and generation."""
-    print("\n" + "=" * 70)
-    print("COMMODITIES DATA COLLECTION")
-    print("=" * 70)
-    
-    try:
-        # Import commodities update function
-        from scripts.Mineral_Commodities_Data_Collection.daily_update import main as commodities_main
-        
-        # Run commodities collection (may call sys.exit, so catch SystemExit)
-        try:
-            commodities_main()
-            return True, None
-        except SystemExit as e:
-            # Script called sys.exit() - check exit code
-            if e.code == 0:
-                return True, None
-            else:
-                return False, f"Commodities update exited with code {e.code}"
-        
-    except Exception as e:
-        error_msg = f"Commodities update failed: {e}"
-        print(f"\n❌ {error_msg}")
-        import traceback
-        traceback.print_exc()
-        return False, error_msg
+    return _run_pipeline("commodities", "COMMODITIES DATA COLLECTION", _COMMODITIES_SCRIPT)
 
 
 def main():
     """Main function to run both forex and commodities data collection."""
-    print("=" * 70)
-    print("AUD Daily Tracker - Unified Data Collection")
-    print("Collecting: Forex (USD, EUR, CNY, SGD, JPY) + Commodities (Gold, Silver, Copper, Aluminium, Nickel)")
-    print("=" * 70)
-    
     cairns_time = get_cairns_time()
-    print(f"Current Cairns time: {cairns_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-    print(f"Target time: 5:00 PM AEST (COB)")
-    print()
+    banner = [
+        "=" * 70,
+        "AUD Daily Tracker - Unified Data Collection",
+        "Collecting: Forex (USD, EUR, CNY, SGD, JPY) + Commodities (Gold, Silver, Copper, Aluminium, Nickel)",
+        "=" * 70,
+        f"Current Cairns time: {cairns_time.strftime('%Y-%m-%d %H:%M:%S %Z')}",
+        "Target time: 5:00 PM AEST (COB)",
+        "",
+    ]
     
     # Check if it's COB time (optional - can be run manually anytime)
-    if not is_cob_time():
-        print("Note: Not currently COB time, but proceeding with update...")
-        print()
+    if not is_cob_time(cairns_time):
+        banner += ["Note: Not currently COB time, but proceeding with update...", ""]
+    write_lines(*banner)
     
     # Track results
     results = {
@@ -117,29 +118,33 @@ def main():
         'commodities': {'success': False, 'error': None}
     }
     
-    # Run forex update
-    forex_success, forex_error = run_forex_update()
+    # Run forex and commodities updates concurrently - both are dominated by
+    # network I/O and write to separate files. Each runs even if the other fails.
+    # Output lines are prefixed with [forex]/[commodities] so interleaved logs stay readable.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        forex_future = executor.submit(run_forex_update)
+        commodities_future = executor.submit(run_commodities_update)
+        
+        forex_success, forex_error = forex_future.result()
+        commodities_success, commodities_error = commodities_future.result()
+    
     results['forex']['success'] = forex_success
     results['forex']['error'] = forex_error
-    
-    # Run commodities update (even if forex failed)
-    commodities_success, commodities_error = run_commodities_update()
     results['commodities']['success'] = commodities_success
     results['commodities']['error'] = commodities_error
     
     # Print summary
-    print("\n" + "=" * 70)
-    print("UNIFIED UPDATE SUMMARY")
-    print("=" * 70)
-    print(f"Forex:        {'✓ SUCCESS' if results['forex']['success'] else '✗ FAILED'}")
+    summary = ["", "=" * 70, "UNIFIED UPDATE SUMMARY", "=" * 70]
+    summary.append(f"Forex:        {'✓ SUCCESS' if results['forex']['success'] else '✗ FAILED'}")
     if results['forex']['error']:
-        print(f"  Error: {results['forex']['error']}")
+        summary.append(f"  Error: {results['forex']['error']}")
     
-    print(f"Commodities:  {'✓ SUCCESS' if results['commodities']['success'] else '✗ FAILED'}")
+    summary.append(f"Commodities:  {'✓ SUCCESS' if results['commodities']['success'] else '✗ FAILED'}")
     if results['commodities']['error']:
-        print(f"  Error: {results['commodities']['error']}")
+        summary.append(f"  Error: {results['commodities']['error']}")
     
-    print("=" * 70)
+    summary.append("=" * 70)
+    write_lines(*summary)
     
     # Exit with appropriate code
     if results['forex']['success'] and results['commodities']['success']:
@@ -18,34 +18,52 @@ Usage:
 
 import sys
 import os
+import traceback
 from datetime import datetime
 
-# Add project root to path
+# Add project root to path (once, even when imported from another script)
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.insert(0, project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.commodity_collector import (
     collect_all_commodity_data,
     fetch_metals_dev_timeseries,
     extract_timeseries_commodity_prices,
-    fetch_base_metals_yfinance
+    fetch_base_metals_yfinance,
+    fetch_base_metals_yfinance_range
 )
-from src.commodity_storage import load_commodity_data
-from src.commodity_storage import save_raw_commodity_data, save_daily_commodity_data, save_to_commodity_table
+from src.commodity_storage import save_raw_commodity_data, save_daily_commodity_data, save_to_commodity_table, save_to_commodity_table_bulk
 from src.commodity_formatter import standardize_commodity_data
-from scripts.generate_mineral_commodities_html import generate_mineral_commodities_html
+from src.formatter_utils import parse_ymd
+from src.base_storage import decode_json, encode_json
+from scripts.generate_mineral_commodities_html import generate_mineral_commodities_html, commodity_output_paths
 from scripts.cleanup_raw_files import cleanup_raw_files
+from scripts.html_utils import html_to_jpeg_batch
+from scripts.update_utils import TEMPLATES_DIR
 
+_TEMPLATE_PATH = TEMPLATES_DIR / 'commodities_m_template.html'
 
-def process_single_date(date_str: str, use_timeseries: bool = False, timeseries_data: dict = None, fill_missing_base_metals: bool = True):
+# Base metals that Metals.Dev often omits (filled from yfinance)
+_BASE_METALS = ("COPPER", "ALUMINIUM", "NICKEL")
+
+
+def prepare_single_date(date_str: str, use_timeseries: bool = False, timeseries_data: dict = None, fill_missing_base_metals: bool = True,
+                        yfinance_range_data: dict = None, save_table: bool = True):
     """
-    Process and save data for a single date.
+    Collect, standardize and save data (JSON and CSV) for a single date.
     
     Args:
         date_str: Date in YYYY-MM-DD format
         use_timeseries: If True, extract from timeseries_data instead of fetching current data
         timeseries_data: Pre-fetched timeseries API response (required if use_timeseries=True)
         fill_missing_base_metals: If True, use yfinance to fill missing copper/aluminium/nickel prices
+        yfinance_range_data: Optional pre-fetched yfinance prices by date (from
+                             fetch_base_metals_yfinance_range); fetched per date if None
+        save_table: If False, skip the history CSV update (the caller saves rows in bulk)
+        
+    Returns:
+        Standardized data for the date, or None if nothing was saved
     """
     print(f"\n{'=' * 60}")
     print(f"Processing date: {date_str}")
@@ -55,12 +73,14 @@ def process_single_date(date_str: str, use_timeseries: bool = False, timeseries_
         # Try to load existing data first
         existing_data_path = os.path.join("data", "commodities_data", "processed", f"commodity_daily_{date_str}.json")
         existing_data = None
-        if os.path.exists(existing_data_path):
-            try:
-                existing_data = load_commodity_data(existing_data_path)
-                print(f"Found existing data for {date_str}, will merge with new data")
-            except Exception as e:
-                print(f"Warning: Could not load existing data: {e}")
+        try:
+            with open(existing_data_path, 'rb') as f:
+                existing_data = decode_json(f.read())
+            print(f"Found existing data for {date_str}, will merge with new data")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not load existing data: {e}")
         
         if use_timeseries and timeseries_data:
             # Extract data for this date from timeseries response
@@ -90,64 +110,55 @@ def process_single_date(date_str: str, use_timeseries: bool = False, timeseries_
                         if isinstance(commodity, dict):
                             commodity["date"] = date_str
         
-        # Standardize data (this will also set the date)
-        standardized_data = standardize_commodity_data(data)
-        # Override the date to ensure it's the requested date
-        standardized_data['date'] = date_str
+        # Standardize data, stamping the requested date on the data and every commodity
+        standardized_data = standardize_commodity_data(data, assume_date=date_str)
         
-        # Update commodity dates to match
-        for commodity in standardized_data.get('commodities', {}).values():
-            if isinstance(commodity, dict):
-                commodity['date'] = date_str
+        commodities = standardized_data['commodities']
         
         # Fill missing base metals with yfinance if requested
         if fill_missing_base_metals:
             print("Checking for missing base metals (Copper, Aluminium, Nickel)...")
-            base_metals_needed = ["COPPER", "ALUMINIUM", "NICKEL"]
-            missing_metals = []
-            
-            for metal in base_metals_needed:
-                metal_data = standardized_data.get('commodities', {}).get(metal, {})
-                if not metal_data or metal_data.get('price_aud') is None:
-                    missing_metals.append(metal)
+            missing_metals = [metal for metal in _BASE_METALS
+                              if (commodities.get(metal) or {}).get('price_aud') is None]
             
             if missing_metals:
                 print(f"Fetching missing base metals from yfinance: {', '.join(missing_metals)}")
-                yfinance_data = fetch_base_metals_yfinance(date_str)
+                if yfinance_range_data is not None:
+                    yfinance_data = yfinance_range_data.get(date_str, {})
+                else:
+                    yfinance_data = fetch_base_metals_yfinance(date_str)
                 
                 # Merge yfinance data into standardized data
                 for metal, metal_data in yfinance_data.items():
                     if metal in missing_metals and metal_data.get('price_aud') is not None:
-                        standardized_data['commodities'][metal] = metal_data
+                        commodities[metal] = metal_data
                         print(f"  ✓ Filled {metal} from yfinance")
         
         # Merge with existing data if available (preserve existing data for metals not in new data)
         if existing_data:
-            existing_commodities = existing_data.get('commodities', {})
-            for metal, metal_data in existing_commodities.items():
+            for metal, metal_data in existing_data.get('commodities', {}).items():
                 # Only preserve if new data doesn't have it or it's None
-                if metal not in standardized_data.get('commodities', {}) or \
-                   standardized_data['commodities'][metal].get('price_aud') is None:
-                    if metal_data.get('price_aud') is not None:
-                        standardized_data['commodities'][metal] = metal_data
-                        print(f"  Preserved existing {metal} data")
+                if (commodities.get(metal) or {}).get('price_aud') is None \
+                        and metal_data.get('price_aud') is not None:
+                    commodities[metal] = metal_data
+                    print(f"  Preserved existing {metal} data")
         
         # Check if we got any data
-        if not standardized_data.get('commodities'):
+        if not commodities:
             print(f"Warning: No commodity data collected for {date_str}")
-            return False
+            return None
         
         # Check if we have valid prices
         has_valid_prices = any(
             comm.get('price_aud') is not None 
-            for comm in standardized_data.get('commodities', {}).values()
+            for comm in commodities.values()
         )
         
         if not has_valid_prices:
             print(f"Warning: No valid prices found for {date_str} - skipping")
-            return False
+            return None
         
-        print(f"Data collected for commodities: {list(standardized_data.get('commodities', {}).keys())}")
+        print(f"Data collected for commodities: {list(commodities)}")
         
         # Save raw data (with timestamp) - only for single date mode or first date in range
         if not use_timeseries:
@@ -156,40 +167,129 @@ def process_single_date(date_str: str, use_timeseries: bool = False, timeseries_
         
         # Save daily data (date-based filename, overwrites if exists)
         print("Saving daily data...")
-        save_daily_commodity_data(standardized_data, output_dir="data/commodities_data/processed")
+        save_daily_commodity_data(standardized_data, output_dir="data/commodities_data/processed",
+                                  encoded=encode_json(standardized_data))
         
         # Save to commodity history table (CSV)
-        print("Saving to commodity history table...")
-        save_to_commodity_table(standardized_data)
-        
-        # Generate mineral commodities HTML and JPEG
-        print("Generating HTML and JPEG...")
-        template_path = os.path.join(os.path.dirname(__file__), '..', 'templates', 'commodities_m_template.html')
-        if not os.path.exists(template_path):
-            template_path = "templates/commodities_m_template.html"
-        
-        if os.path.exists(template_path):
-            html_path, jpeg_path = generate_mineral_commodities_html(
-                template_path,
-                output_dir="data/commodities_data",
-                standardized_data=standardized_data
-            )
-            print(f"✓ Successfully generated HTML: {html_path}")
-            if jpeg_path:
-                print(f"✓ Successfully generated JPEG: {jpeg_path}")
-            else:
-                print(f"⚠ JPEG generation failed (HTML was still created)")
-        else:
-            print(f"Warning: Template not found at {template_path}, skipping HTML generation.")
+        if save_table:
+            print("Saving to commodity history table...")
+            save_to_commodity_table(standardized_data, already_standardized=True)
         
-        print(f"✓ Data collection complete for {date_str}!")
-        return True
+        return standardized_data
         
     except Exception as e:
         print(f"\n❌ Error processing date {date_str}: {e}")
-        import traceback
         traceback.print_exc()
+        return None
+
+
+def render_single_date(standardized_data: dict) -> tuple:
+    """
+    Generate the mineral commodities HTML and JPEG for one date.
+    
+    Reports failures back instead of raising (HTML/JPEG problems only warn).
+    
+    Args:
+        standardized_data: Standardized commodity data for the date
+        
+    Returns:
+        Tuple of (date_str, html_path, jpeg_path, error); paths are None on failure
+    """
+    date_str = standardized_data.get('date')
+    try:
+        html_path, jpeg_path = generate_mineral_commodities_html(
+            str(_TEMPLATE_PATH),
+            output_dir="data/commodities_data",
+            standardized_data=standardized_data
+        )
+        return date_str, html_path, jpeg_path, None
+    except Exception as e:
+        return date_str, None, None, str(e)
+
+
+def report_render_result(result: tuple) -> bool:
+    """
+    Print the outcome of render_single_date.
+    
+    Args:
+        result: Tuple returned by render_single_date
+        
+    Returns:
+        True if the HTML was generated
+    """
+    date_str, html_path, jpeg_path, error = result
+    if error:
+        print(f"⚠ HTML/JPEG generation failed for {date_str}: {error}")
+        return False
+    print(f"✓ Successfully generated HTML: {html_path}")
+    if jpeg_path:
+        print(f"✓ Successfully generated JPEG: {jpeg_path}")
+    else:
+        print(f"⚠ JPEG generation failed (HTML was still created)")
+    return True
+
+
+def process_single_date(date_str: str, use_timeseries: bool = False, timeseries_data: dict = None, fill_missing_base_metals: bool = True):
+    """
+    Process and save data for a single date, including HTML and JPEG.
+    
+    Args:
+        date_str: Date in YYYY-MM-DD format
+        use_timeseries: If True, extract from timeseries_data instead of fetching current data
+        timeseries_data: Pre-fetched timeseries API response (required if use_timeseries=True)
+        fill_missing_base_metals: If True, use yfinance to fill missing copper/aluminium/nickel prices
+    """
+    standardized_data = prepare_single_date(date_str, use_timeseries, timeseries_data, fill_missing_base_metals)
+    if standardized_data is None:
         return False
+    
+    print("Generating HTML and JPEG...")
+    if _TEMPLATE_PATH.is_file():
+        report_render_result(render_single_date(standardized_data))
+    else:
+        print(f"Warning: Template not found at {_TEMPLATE_PATH}, skipping HTML generation.")
+    
+    print(f"✓ Data collection complete for {date_str}!")
+    return True
+
+
+def render_dates(payloads: list) -> None:
+    """
+    Render HTML and JPEG for several dates.
+    
+    The HTML files are written one by one (templating is cheap), then all JPEGs
+    are rendered concurrently as pages of a single headless browser.
+    
+    Args:
+        payloads: Standardized data dicts, one per date
+    """
+    if not payloads:
+        return
+    if not _TEMPLATE_PATH.is_file():
+        print(f"Warning: Template not found at {_TEMPLATE_PATH}, skipping HTML generation.")
+        return
+    
+    print(f"\nGenerating HTML for {len(payloads)} date(s)...")
+    rendered = []
+    for standardized_data in payloads:
+        date_str = standardized_data.get('date')
+        try:
+            html_path, _ = generate_mineral_commodities_html(
+                str(_TEMPLATE_PATH),
+                output_dir="data/commodities_data",
+                standardized_data=standardized_data,
+                convert_jpeg=False
+            )
+        except Exception as e:
+            report_render_result((date_str, None, None, str(e)))
+            continue
+        _, jpeg_path = commodity_output_paths("data/commodities_data", date_str)
+        rendered.append((date_str, html_path, jpeg_path))
+    
+    print(f"\nConverting {len(rendered)} HTML file(s) to JPEG...")
+    jpeg_results = html_to_jpeg_batch([(html_path, jpeg_path) for _, html_path, jpeg_path in rendered])
+    for (date_str, html_path, _), jpeg_path in zip(rendered, jpeg_results):
+        report_render_result((date_str, html_path, jpeg_path, None))
 
 
 def main():
@@ -207,7 +307,7 @@ def main():
     
     # Validate start date format
     try:
-        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        start_date = parse_ymd(start_date_str)
     except ValueError:
         print(f"Error: Invalid date format. Use YYYY-MM-DD (e.g., 2026-01-14)")
         sys.exit(1)
@@ -216,7 +316,7 @@ def main():
     if len(sys.argv) >= 3:
         end_date_str = sys.argv[2]
         try:
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+            end_date = parse_ymd(end_date_str)
         except ValueError:
             print(f"Error: Invalid end date format. Use YYYY-MM-DD (e.g., 2026-01-16)")
             sys.exit(1)
@@ -274,17 +374,31 @@ def main():
             save_raw_commodity_data(raw_data, output_dir="data/commodities_data/raw")
             print()
             
-            # Process each date in the range
+            # Collect and save each date in order (JSON per date, then one history CSV
+            # update for the range); JPEG rendering is then done concurrently
             dates_to_process = sorted(rates.keys())
-            successful = 0
+            payloads = []
             failed = 0
             
+            # Fetch base metals for the whole range once instead of per date
+            print("Fetching base metals (Copper, Aluminium, Nickel) from yfinance for the date range...")
+            yfinance_range_data = fetch_base_metals_yfinance_range(dates_to_process[0], dates_to_process[-1])
+            
             for date_str in dates_to_process:
-                success = process_single_date(date_str, use_timeseries=True, timeseries_data=timeseries_data, fill_missing_base_metals=True)
-                if success:
-                    successful += 1
+                standardized_data = prepare_single_date(date_str, use_timeseries=True, timeseries_data=timeseries_data, fill_missing_base_metals=True,
+                                                        yfinance_range_data=yfinance_range_data, save_table=False)
+                if standardized_data is not None:
+                    payloads.append(standardized_data)
                 else:
                     failed += 1
+            successful = len(payloads)
+            
+            # Update the history table once for the whole range
+            if payloads:
+                print("\nSaving to commodity history table...")
+                save_to_commodity_table_bulk(payloads, already_standardized=True)
+            
+            render_dates(payloads)
             
             # Cleanup raw files after processing all dates
             try:
@@ -322,7 +436,6 @@ def main():
         
     except Exception as e:
         print(f"\n❌ Error during data collection: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
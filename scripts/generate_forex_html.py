@@ -9,40 +9,50 @@ converts it to JPEG format saved to data/forex_data/JPEG/.
 
 import sys
 import os
-from datetime import datetime, timedelta
+import re
+from datetime import datetime
 from pathlib import Path
 
-# Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add project root to path (once, even when imported from another script)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.currency_collector import fetch_currency_rates
 from src.currency_formatter import standardize_data
 from src.currency_history import load_currency_history_csv
-import pandas as pd
+from src.base_storage import ensure_directory_exists
+from src.formatter_utils import format_full_date, parse_ymd
 
-# Import HTML utilities
-try:
-    from .html_utils import (
-        generate_arrow_html as generate_arrow_html_base,
-        html_to_jpeg,
-        PLAYWRIGHT_AVAILABLE,
-        SELENIUM_AVAILABLE
-    )
-except ImportError:
-    try:
-        from html_utils import (
-            generate_arrow_html as generate_arrow_html_base,
-            html_to_jpeg,
-            PLAYWRIGHT_AVAILABLE,
-            SELENIUM_AVAILABLE
-        )
-    except ImportError:
-        from scripts.html_utils import (
-            generate_arrow_html as generate_arrow_html_base,
-            html_to_jpeg,
-            PLAYWRIGHT_AVAILABLE,
-            SELENIUM_AVAILABLE
-        )
+# Import HTML utilities (project root is on sys.path above)
+from scripts.html_utils import (
+    generate_arrow_html as generate_arrow_html_base,
+    html_to_jpeg,
+    load_history_by_date,
+    load_template,
+    previous_row,
+    PLAYWRIGHT_AVAILABLE,
+    SELENIUM_AVAILABLE
+)
+from scripts.update_utils import write_lines
+
+# Single-pass matcher for date, rate and arrow placeholders ({{NAME}} or {NAME}); the
+# group captures the whole token so split() alternates literal text and placeholders
+_PLACEHOLDER_RE = re.compile(r'(\{\{?(?:FULL_DATE|(?:USD|EUR|JPY|CNY|SGD)_(?:RATE|ARROW))\}?\})')
+
+# Placeholder keys per currency in both brace styles ({{X}}, {X}), built once
+_CURRENCIES = ("USD", "EUR", "JPY", "CNY", "SGD")
+_RATE_KEYS = {c: ("{{" + c + "_RATE}}", "{" + c + "_RATE}") for c in _CURRENCIES}
+_ARROW_KEYS = {c: ("{{" + c + "_ARROW}}", "{" + c + "_ARROW}") for c in _CURRENCIES}
+# History CSV rate column per currency
+_RATE_COLUMNS = {c: c.lower() + "_rate" for c in _CURRENCIES}
+
+# Default template locations searched when none is given (relative to the working directory)
+_DEFAULT_TEMPLATE_PATHS = (
+    "templates/forex_template.html",
+    "forex_template.html",
+    "template.html",
+)
 
 
 def fetch_all_currency_rates():
@@ -84,47 +94,12 @@ def get_previous_day_rates(current_date_str, csv_path="data/forex_data/processed
         Dictionary with currency codes as keys and rates as values, or None if not found
     """
     try:
-        # Try relative path first, then absolute path
-        if not os.path.exists(csv_path):
-            # Try relative to script location
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            alt_path = os.path.join(script_dir, '..', csv_path)
-            if os.path.exists(alt_path):
-                csv_path = os.path.abspath(alt_path)
-            else:
-                return None
-        
-        df = load_currency_history_csv(csv_path)
-        
-        if df is None or df.empty:
+        df_by_date = load_history_by_date(csv_path, load_currency_history_csv)
+        if df_by_date is None or df_by_date.empty:
             return None
         
-        # Ensure date column is plain date objects (robust across environments)
-        df['date'] = pd.to_datetime(df['date']).dt.date
-        
-        # Parse current date
-        current_date = datetime.strptime(current_date_str, "%Y-%m-%d").date()
-        
-        # Find previous day (go back up to 7 days to find the most recent data)
-        previous_rates = None
-        for days_back in range(1, 8):
-            check_date = current_date - timedelta(days=days_back)
-            previous_row = df[df['date'] == check_date]
-            
-            if not previous_row.empty:
-                row = previous_row.iloc[0]
-                previous_rates = {
-                    "USD": row.get('usd_rate') if pd.notna(row.get('usd_rate')) else None,
-                    "EUR": row.get('eur_rate') if pd.notna(row.get('eur_rate')) else None,
-                    "JPY": row.get('jpy_rate') if pd.notna(row.get('jpy_rate')) else None,
-                    "CNY": row.get('cny_rate') if pd.notna(row.get('cny_rate')) else None,
-                    "SGD": row.get('sgd_rate') if pd.notna(row.get('sgd_rate')) else None,
-                }
-                # Verify we got at least one valid rate
-                if any(v is not None for v in previous_rates.values()):
-                    return previous_rates
-        
-        return None
+        # Most recent of the previous 7 days with at least one valid rate
+        return previous_row(df_by_date, parse_ymd(current_date_str).date(), _RATE_COLUMNS)
     except Exception as e:
         print(f"Warning: Could not load previous day's rates: {e}")
         return None
@@ -144,7 +119,7 @@ def generate_arrow_html(current_rate, previous_rate):
     return generate_arrow_html_base(current_rate, previous_rate, arrow_class="currency-arrow")
 
 
-def replace_html_placeholders(html_content, data, include_arrows=False):
+def replace_html_placeholders(html_content, data, include_arrows=False, already_standardized=False):
     """
     Replace placeholders in HTML content with actual data.
     
@@ -152,57 +127,66 @@ def replace_html_placeholders(html_content, data, include_arrows=False):
         html_content: The HTML template content as string
         data: Standardized data dictionary with currencies
         include_arrows: Whether to include arrow placeholders (for arrow template)
+        already_standardized: True if data came from the standardizer (skips the structure check)
         
     Returns:
         HTML content with placeholders replaced
     """
-    # Preserve the date from input data if it exists (for historical dates)
-    preserved_date = data.get("date") if isinstance(data, dict) else None
+    # Check if data is already standardized (has "currencies" key with proper structure).
+    # Standardized data is only read here, so it is used as-is without a copy.
+    if already_standardized or (isinstance(data, dict) and "currencies" in data and isinstance(data["currencies"], dict)):
+        return _replace_normalized(html_content, data, include_arrows)
     
-    # Check if data is already standardized (has "currencies" key with proper structure)
-    if isinstance(data, dict) and "currencies" in data and isinstance(data["currencies"], dict):
-        # Data is already standardized, use it directly
-        standardized = data.copy()
-    else:
-        # Data needs standardization
-        standardized = standardize_data(data)
+    # Data needs standardization; preserve the date from input data if it exists (for historical dates)
+    preserved_date = data.get("date") if isinstance(data, dict) else None
+    return _replace_normalized(html_content, standardize_data(data), include_arrows, date_str=preserved_date)
+
+
+def _replace_normalized(html_content, standardized, include_arrows=False, date_str=None):
+    """
+    Replace placeholders in HTML content with already standardized data.
     
-    # Use preserved date if available, otherwise use standardized date, otherwise today
-    date_str = preserved_date or standardized.get("date") or datetime.now().strftime("%Y-%m-%d")
-    # Ensure standardized data uses the correct date
-    standardized["date"] = date_str
+    Args:
+        html_content: The HTML template content as string
+        standardized: Standardized data dictionary with currencies
+        include_arrows: Whether to include arrow placeholders (for arrow template)
+        date_str: Optional date (YYYY-MM-DD) overriding the standardized date
+        
+    Returns:
+        HTML content with placeholders replaced
+    """
+    # Use the given date if available, otherwise use standardized date, otherwise today
+    date_str = date_str or standardized.get("date") or datetime.now().strftime("%Y-%m-%d")
     
-    full_date = datetime.strptime(date_str, "%Y-%m-%d").strftime("%B %d, %Y")
+    full_date = format_full_date(date_str)
     
     # Get currency rates
     currencies = standardized.get("currencies", {})
-    rates = {
-        "USD": currencies.get("USD", {}).get("rate") if currencies.get("USD") else None,
-        "EUR": currencies.get("EUR", {}).get("rate") if currencies.get("EUR") else None,
-        "JPY": currencies.get("JPY", {}).get("rate") if currencies.get("JPY") else None,
-        "CNY": currencies.get("CNY", {}).get("rate") if currencies.get("CNY") else None,
-        "SGD": currencies.get("SGD", {}).get("rate") if currencies.get("SGD") else None,
-    }
+    rates = {currency: (currencies.get(currency) or {}).get("rate") for currency in _CURRENCIES}
+    
+    # Progress lines for this render, written together at the end
+    log_lines = []
     
     # Get previous day's rates if arrows are needed
     previous_rates = None
     if include_arrows:
         previous_rates = get_previous_day_rates(date_str)
         if previous_rates:
-            print(f"  Found previous day's rates for comparison")
+            log_lines.append("  Found previous day's rates for comparison")
         else:
-            print(f"  Warning: No previous day's rates found - arrows will not be displayed")
+            log_lines.append("  Warning: No previous day's rates found - arrows will not be displayed")
     
-    # Build replacement dictionary
+    # Build replacement dictionary (arrows are only substituted for arrow templates;
+    # unmatched placeholders are left as they are)
     replacements = {
         "{{FULL_DATE}}": full_date,
         "{FULL_DATE}": full_date,
     }
     
-    for currency in ["USD", "EUR", "JPY", "CNY", "SGD"]:
+    for currency in _CURRENCIES:
         rate_value = format_rate(rates[currency], decimals=3)
-        replacements["{{" + currency + "_RATE}}"] = rate_value
-        replacements["{" + currency + "_RATE}"] = rate_value
+        double_key, single_key = _RATE_KEYS[currency]
+        replacements[double_key] = replacements[single_key] = rate_value
         
         # Add arrow if needed
         if include_arrows:
@@ -211,24 +195,25 @@ def replace_html_placeholders(html_content, data, include_arrows=False):
                 arrow_html = generate_arrow_html(rates[currency], previous_rates.get(currency))
                 if arrow_html:
                     direction = "up" if rates[currency] and previous_rates.get(currency) and float(rates[currency]) > float(previous_rates.get(currency)) else "down"
-                    print(f"  {currency}: {rate_value} ({direction} from previous day)")
+                    log_lines.append(f"  {currency}: {rate_value} ({direction} from previous day)")
             else:
-                print(f"  {currency}: {rate_value} (no previous data for comparison)")
-            replacements["{{" + currency + "_ARROW}}"] = arrow_html
-            replacements["{" + currency + "_ARROW}"] = arrow_html
+                log_lines.append(f"  {currency}: {rate_value} (no previous data for comparison)")
+            double_key, single_key = _ARROW_KEYS[currency]
+            replacements[double_key] = replacements[single_key] = arrow_html
     
-    # Replace all placeholders
-    result = html_content
-    for placeholder, value in replacements.items():
-        result = result.replace(placeholder, str(value))
+    if log_lines:
+        write_lines(*log_lines)
     
-    return result
+    # Replace all placeholders in one pass (odd split parts are placeholders)
+    parts = _PLACEHOLDER_RE.split(html_content)
+    parts[1::2] = [replacements.get(part, part) for part in parts[1::2]]
+    return "".join(parts)
 
 
 # html_to_jpeg is imported from html_utils
 
 
-def generate_forex_html(template_path, output_dir="data/forex_data", standardized_data=None):
+def generate_forex_html(template_path, output_dir="data/forex_data", standardized_data=None, browser=None):
     """
     Generate HTML file from template with daily forex data.
     Also saves a JPEG version of the HTML.
@@ -237,18 +222,14 @@ def generate_forex_html(template_path, output_dir="data/forex_data", standardize
         template_path: Path to the HTML template file
         output_dir: Base directory to save the generated files (will create HTML/ and JPEG/ subdirectories)
         standardized_data: Optional pre-standardized data dictionary. If None, fetches fresh data.
+        browser: Optional open browser from html_utils.browser_session, reused for the JPEG
         
     Returns:
         Tuple of (path to HTML file, path to JPEG file) or (path to HTML file, None) if JPEG conversion failed
     """
-    # Check if template exists
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"Template file not found: {template_path}")
-    
-    # Read template
+    # Read template (cached across calls while the file is unchanged)
     print(f"Reading template: {template_path}")
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+    template_content = load_template(template_path)
     
     # Use provided data or fetch fresh data
     if standardized_data is None:
@@ -266,23 +247,21 @@ def generate_forex_html(template_path, output_dir="data/forex_data", standardize
         # Note: Data saving is handled by the calling script (daily_update.py)
         # This function only generates HTML/JPEG from the provided standardized_data
     
-    # Check if template has arrow placeholders by looking for ARROW placeholders in the content
-    is_arrow_template = any(f"{{{{{currency}_ARROW}}}}" in template_content or 
-                            f"{{{currency}_ARROW}}" in template_content
-                            for currency in ["USD", "EUR", "JPY", "CNY", "SGD"])
+    # Check if template has arrow placeholders; "_ARROW}" ends every {X_ARROW} / {{X_ARROW}} placeholder
+    is_arrow_template = "_ARROW}" in template_content
     
     if is_arrow_template:
         print("Arrow placeholders detected in template - will include arrows based on previous day's rates")
     
     # Replace placeholders
     print("Replacing placeholders...")
-    html_content = replace_html_placeholders(template_content, standardized_data, include_arrows=is_arrow_template)
+    html_content = _replace_normalized(template_content, standardized_data, include_arrows=is_arrow_template)
     
     # Create output subdirectories
     html_dir = os.path.join(output_dir, "HTML")
     jpeg_dir = os.path.join(os.path.dirname(os.path.normpath(output_dir)), "JPEG")
-    Path(html_dir).mkdir(parents=True, exist_ok=True)
-    Path(jpeg_dir).mkdir(parents=True, exist_ok=True)
+    ensure_directory_exists(html_dir)
+    ensure_directory_exists(jpeg_dir)
     
     # Generate output filename with date
     date_str = standardized_data.get("date") or datetime.now().strftime("%Y-%m-%d")
@@ -293,14 +272,13 @@ def generate_forex_html(template_path, output_dir="data/forex_data", standardize
     
     # Save generated HTML
     print(f"Saving HTML to: {html_path}")
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    Path(html_path).write_text(html_content, encoding='utf-8')
     
     print(f"✓ HTML generated successfully: {html_path}")
     
     # Convert HTML to JPEG
     print(f"Converting HTML to JPEG...")
-    jpeg_result = html_to_jpeg(html_path, jpeg_path)
+    jpeg_result = html_to_jpeg(html_path, jpeg_path, browser=browser)
     
     return (html_path, jpeg_result)
 
@@ -347,15 +325,7 @@ def main():
     # Default template path if not provided
     template_path = args.template
     if not template_path:
-        possible_paths = [
-            "templates/forex_template.html",
-            "forex_template.html",
-            "template.html"
-        ]
-        for path in possible_paths:
-            if os.path.exists(path):
-                template_path = path
-                break
+        template_path = next((path for path in _DEFAULT_TEMPLATE_PATHS if os.path.isfile(path)), None)
         
         if not template_path:
             print("Error: No template file specified and no default template found.")
@@ -9,40 +9,52 @@ converts it to JPEG format saved to data/commodities_data/JPEG/.
 
 import sys
 import os
-from datetime import datetime, timedelta
+import re
+from datetime import datetime
 from pathlib import Path
 
-# Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add project root to path (once, even when imported from another script)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.commodity_collector import collect_all_commodity_data
 from src.commodity_formatter import standardize_commodity_data
+from src.formatter_utils import format_full_date, parse_ymd
 from src.commodity_history import load_commodity_history_csv
-import pandas as pd
+from src.base_storage import ensure_directory_exists
 
-# Import HTML utilities
-try:
-    from .html_utils import (
-        generate_arrow_html as generate_arrow_html_base,
-        html_to_jpeg,
-        PLAYWRIGHT_AVAILABLE,
-        SELENIUM_AVAILABLE
-    )
-except ImportError:
-    try:
-        from html_utils import (
-            generate_arrow_html as generate_arrow_html_base,
-            html_to_jpeg,
-            PLAYWRIGHT_AVAILABLE,
-            SELENIUM_AVAILABLE
-        )
-    except ImportError:
-        from scripts.html_utils import (
-            generate_arrow_html as generate_arrow_html_base,
-            html_to_jpeg,
-            PLAYWRIGHT_AVAILABLE,
-            SELENIUM_AVAILABLE
-        )
+# Import HTML utilities (project root is on sys.path above)
+from scripts.html_utils import (
+    generate_arrow_html as generate_arrow_html_base,
+    html_to_jpeg,
+    load_history_by_date,
+    load_template,
+    previous_row,
+    PLAYWRIGHT_AVAILABLE,
+    SELENIUM_AVAILABLE
+)
+from scripts.update_utils import write_lines
+
+# Single-pass matcher for date, price and arrow placeholders ({{NAME}} or {NAME}); the
+# group captures the whole token so split() alternates literal text and placeholders
+_PLACEHOLDER_RE = re.compile(
+    r'(\{\{?(?:FULL_DATE|(?:GOLD|SILVER|COPPER|ALUMINIUM|NICKEL)_(?:RATE|ARROW))\}?\})'
+)
+
+# Placeholder keys per commodity in both brace styles ({{X}}, {X}), built once
+_COMMODITIES = ("GOLD", "SILVER", "COPPER", "ALUMINIUM", "NICKEL")
+_RATE_KEYS = {c: ("{{" + c + "_RATE}}", "{" + c + "_RATE}") for c in _COMMODITIES}
+_ARROW_KEYS = {c: ("{{" + c + "_ARROW}}", "{" + c + "_ARROW}") for c in _COMMODITIES}
+# History CSV price column per commodity
+_PRICE_COLUMNS = {c: c.lower() + "_price" for c in _COMMODITIES}
+
+# Default template locations searched when none is given (relative to the working directory)
+_DEFAULT_TEMPLATE_PATHS = (
+    "templates/commodities_m_template.html",
+    "commodities_m_template.html",
+    "template.html",
+)
 
 
 def format_price(price, decimals=2):
@@ -73,47 +85,12 @@ def get_previous_day_prices(current_date_str, csv_path="data/commodities_data/pr
         Dictionary with commodity codes as keys and prices as values, or None if not found
     """
     try:
-        # Try relative path first, then absolute path
-        if not os.path.exists(csv_path):
-            # Try relative to script location
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            alt_path = os.path.join(script_dir, '..', csv_path)
-            if os.path.exists(alt_path):
-                csv_path = os.path.abspath(alt_path)
-            else:
-                return None
-        
-        df = load_commodity_history_csv(csv_path)
-        
-        if df is None or df.empty:
+        df_by_date = load_history_by_date(csv_path, load_commodity_history_csv)
+        if df_by_date is None or df_by_date.empty:
             return None
         
-        # Ensure date column is plain date objects (robust across environments)
-        df['date'] = pd.to_datetime(df['date']).dt.date
-        
-        # Parse current date
-        current_date = datetime.strptime(current_date_str, "%Y-%m-%d").date()
-        
-        # Find previous day (go back up to 7 days to find the most recent data)
-        previous_prices = None
-        for days_back in range(1, 8):
-            check_date = current_date - timedelta(days=days_back)
-            previous_row = df[df['date'] == check_date]
-            
-            if not previous_row.empty:
-                row = previous_row.iloc[0]
-                previous_prices = {
-                    "GOLD": row.get('gold_price') if pd.notna(row.get('gold_price')) else None,
-                    "SILVER": row.get('silver_price') if pd.notna(row.get('silver_price')) else None,
-                    "COPPER": row.get('copper_price') if pd.notna(row.get('copper_price')) else None,
-                    "ALUMINIUM": row.get('aluminium_price') if pd.notna(row.get('aluminium_price')) else None,
-                    "NICKEL": row.get('nickel_price') if pd.notna(row.get('nickel_price')) else None,
-                }
-                # Verify we got at least one valid price
-                if any(v is not None for v in previous_prices.values()):
-                    return previous_prices
-        
-        return None
+        # Most recent of the previous 7 days with at least one valid price
+        return previous_row(df_by_date, parse_ymd(current_date_str).date(), _PRICE_COLUMNS)
     except Exception as e:
         print(f"Warning: Could not load previous day's prices: {e}")
         return None
@@ -133,7 +110,7 @@ def generate_arrow_html(current_price, previous_price):
     return generate_arrow_html_base(current_price, previous_price, arrow_class="commodity-arrow")
 
 
-def replace_html_placeholders(html_content, data, include_arrows=False):
+def replace_html_placeholders(html_content, data, include_arrows=False, already_standardized=False):
     """
     Replace placeholders in HTML content with actual commodity data.
     
@@ -141,6 +118,7 @@ def replace_html_placeholders(html_content, data, include_arrows=False):
         html_content: The HTML template content as string
         data: Standardized data dictionary with commodities
         include_arrows: Whether to include arrow placeholders (for arrow template)
+        already_standardized: True if data came from the standardizer (skips the structure check)
         
     Returns:
         HTML content with placeholders replaced
@@ -148,39 +126,34 @@ def replace_html_placeholders(html_content, data, include_arrows=False):
     # Preserve the date from input data if it exists (for historical dates)
     preserved_date = data.get("date") if isinstance(data, dict) else None
     
-    # Check if data is already standardized (has "commodities" key with proper structure)
-    if isinstance(data, dict) and "commodities" in data and isinstance(data["commodities"], dict):
-        # Data is already standardized, use it directly
-        standardized = data.copy()
+    # Check if data is already standardized (has "commodities" key with proper structure).
+    # Standardized data is only read here, so it is used as-is without a copy.
+    if already_standardized or (isinstance(data, dict) and "commodities" in data and isinstance(data["commodities"], dict)):
+        standardized = data
     else:
         # Data needs standardization
         standardized = standardize_commodity_data(data)
     
     # Use preserved date if available, otherwise use standardized date, otherwise today
     date_str = preserved_date or standardized.get("date") or datetime.now().strftime("%Y-%m-%d")
-    # Ensure standardized data uses the correct date
-    standardized["date"] = date_str
     
-    full_date = datetime.strptime(date_str, "%Y-%m-%d").strftime("%B %d, %Y")
+    full_date = format_full_date(date_str)
     
     # Get commodity prices
     commodities = standardized.get("commodities", {})
-    prices = {
-        "GOLD": commodities.get("GOLD", {}).get("price_aud") if commodities.get("GOLD") else None,
-        "SILVER": commodities.get("SILVER", {}).get("price_aud") if commodities.get("SILVER") else None,
-        "COPPER": commodities.get("COPPER", {}).get("price_aud") if commodities.get("COPPER") else None,
-        "ALUMINIUM": commodities.get("ALUMINIUM", {}).get("price_aud") if commodities.get("ALUMINIUM") else None,
-        "NICKEL": commodities.get("NICKEL", {}).get("price_aud") if commodities.get("NICKEL") else None,
-    }
+    prices = {commodity: (commodities.get(commodity) or {}).get("price_aud") for commodity in _COMMODITIES}
+    
+    # Progress lines for this render, written together at the end
+    log_lines = []
     
     # Get previous day's prices if arrows are needed
     previous_prices = None
     if include_arrows:
         previous_prices = get_previous_day_prices(date_str)
         if previous_prices:
-            print(f"  Found previous day's prices for comparison")
+            log_lines.append("  Found previous day's prices for comparison")
         else:
-            print(f"  Warning: No previous day's prices found - arrows will not be displayed")
+            log_lines.append("  Warning: No previous day's prices found - arrows will not be displayed")
     
     # Build replacement dictionary
     replacements = {
@@ -188,10 +161,10 @@ def replace_html_placeholders(html_content, data, include_arrows=False):
         "{FULL_DATE}": full_date,
     }
     
-    for commodity in ["GOLD", "SILVER", "COPPER", "ALUMINIUM", "NICKEL"]:
+    for commodity in _COMMODITIES:
         price_value = format_price(prices[commodity], decimals=2)
-        replacements["{{" + commodity + "_RATE}}"] = price_value
-        replacements["{" + commodity + "_RATE}"] = price_value
+        double_key, single_key = _RATE_KEYS[commodity]
+        replacements[double_key] = replacements[single_key] = price_value
         
         # Add arrow if needed
         if include_arrows:
@@ -200,24 +173,43 @@ def replace_html_placeholders(html_content, data, include_arrows=False):
                 arrow_html = generate_arrow_html(prices[commodity], previous_prices.get(commodity))
                 if arrow_html:
                     direction = "up" if prices[commodity] and previous_prices.get(commodity) and float(prices[commodity]) > float(previous_prices.get(commodity)) else "down"
-                    print(f"  {commodity}: {price_value} ({direction} from previous day)")
+                    log_lines.append(f"  {commodity}: {price_value} ({direction} from previous day)")
             else:
-                print(f"  {commodity}: {price_value} (no previous data for comparison)")
-            replacements["{{" + commodity + "_ARROW}}"] = arrow_html
-            replacements["{" + commodity + "_ARROW}"] = arrow_html
+                log_lines.append(f"  {commodity}: {price_value} (no previous data for comparison)")
+            double_key, single_key = _ARROW_KEYS[commodity]
+            replacements[double_key] = replacements[single_key] = arrow_html
     
-    # Replace all placeholders
-    result = html_content
-    for placeholder, value in replacements.items():
-        result = result.replace(placeholder, str(value))
+    if log_lines:
+        write_lines(*log_lines)
     
-    return result
+    # Replace all placeholders in one pass (odd split parts are placeholders)
+    parts = _PLACEHOLDER_RE.split(html_content)
+    parts[1::2] = [replacements.get(part, part) for part in parts[1::2]]
+    return "".join(parts)
 
 
 # html_to_jpeg is imported from html_utils
 
 
-def generate_mineral_commodities_html(template_path, output_dir="data/commodities_data", standardized_data=None):
+def commodity_output_paths(output_dir, date_str):
+    """
+    Get the HTML and JPEG output paths for a date.
+    
+    Args:
+        output_dir: Base output directory (HTML/ is created inside it, JPEG/ next to it)
+        date_str: Date in YYYY-MM-DD format
+        
+    Returns:
+        Tuple of (HTML path, JPEG path)
+    """
+    html_dir = os.path.join(output_dir, "HTML")
+    jpeg_dir = os.path.join(os.path.dirname(os.path.normpath(output_dir)), "JPEG")
+    return (os.path.join(html_dir, f"commodity_{date_str}.html"),
+            os.path.join(jpeg_dir, f"commodity_{date_str}.jpg"))
+
+
+def generate_mineral_commodities_html(template_path, output_dir="data/commodities_data", standardized_data=None, browser=None,
+                                      convert_jpeg=True):
     """
     Generate HTML file from template with daily mineral commodity data.
     Also saves a JPEG version of the HTML.
@@ -226,18 +218,16 @@ def generate_mineral_commodities_html(template_path, output_dir="data/commoditie
         template_path: Path to the HTML template file
         output_dir: Base directory to save the generated files (will create HTML/ and JPEG/ subdirectories)
         standardized_data: Optional pre-standardized data dictionary. If None, fetches fresh data.
+        browser: Optional open browser from html_utils.browser_session, reused for the JPEG
+        convert_jpeg: If False, only write the HTML (the caller converts it, e.g. in a batch)
         
     Returns:
         Tuple of (path to HTML file, path to JPEG file) or (path to HTML file, None) if JPEG conversion failed
+        or was skipped
     """
-    # Check if template exists
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"Template file not found: {template_path}")
-    
-    # Read template
+    # Read template (cached across calls while the file is unchanged)
     print(f"Reading template: {template_path}")
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+    template_content = load_template(template_path)
     
     # Use provided data or fetch fresh data
     if standardized_data is None:
@@ -252,41 +242,35 @@ def generate_mineral_commodities_html(template_path, output_dir="data/commoditie
     else:
         print("Using provided commodity data...")
     
-    # Check if template has arrow placeholders by looking for ARROW placeholders in the content
-    is_arrow_template = any(f"{{{{{commodity}_ARROW}}}}" in template_content or 
-                            f"{{{commodity}_ARROW}}" in template_content
-                            for commodity in ["GOLD", "SILVER", "COPPER", "ALUMINIUM", "NICKEL"])
+    # Check if template has arrow placeholders; "_ARROW}" ends every {X_ARROW} / {{X_ARROW}} placeholder
+    is_arrow_template = "_ARROW}" in template_content
     
     if is_arrow_template:
         print("Arrow placeholders detected in template - will include arrows based on previous day's prices")
     
     # Replace placeholders
     print("Replacing placeholders...")
-    html_content = replace_html_placeholders(template_content, standardized_data, include_arrows=is_arrow_template)
+    html_content = replace_html_placeholders(template_content, standardized_data, include_arrows=is_arrow_template,
+                                             already_standardized=True)
     
-    # Create output subdirectories
-    html_dir = os.path.join(output_dir, "HTML")
-    jpeg_dir = os.path.join(os.path.dirname(os.path.normpath(output_dir)), "JPEG")
-    Path(html_dir).mkdir(parents=True, exist_ok=True)
-    Path(jpeg_dir).mkdir(parents=True, exist_ok=True)
-    
-    # Generate output filename with date
+    # Output paths by date, creating the output subdirectories
     date_str = standardized_data.get("date") or datetime.now().strftime("%Y-%m-%d")
-    output_filename = f"commodity_{date_str}.html"
-    html_path = os.path.join(html_dir, output_filename)
-    jpeg_filename = f"commodity_{date_str}.jpg"
-    jpeg_path = os.path.join(jpeg_dir, jpeg_filename)
+    html_path, jpeg_path = commodity_output_paths(output_dir, date_str)
+    ensure_directory_exists(os.path.dirname(html_path))
+    ensure_directory_exists(os.path.dirname(jpeg_path))
     
     # Save generated HTML
     print(f"Saving HTML to: {html_path}")
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    Path(html_path).write_text(html_content, encoding='utf-8')
     
     print(f"✓ HTML generated successfully: {html_path}")
     
+    if not convert_jpeg:
+        return (html_path, None)
+    
     # Convert HTML to JPEG
     print(f"Converting HTML to JPEG...")
-    jpeg_result = html_to_jpeg(html_path, jpeg_path)
+    jpeg_result = html_to_jpeg(html_path, jpeg_path, browser=browser)
     
     return (html_path, jpeg_result)
 
@@ -314,15 +298,7 @@ def main():
     # Default template path if not provided
     template_path = args.template
     if not template_path:
-        possible_paths = [
-            "templates/commodities_m_template.html",
-            "commodities_m_template.html",
-            "template.html"
-        ]
-        for path in possible_paths:
-            if os.path.exists(path):
-                template_path = path
-                break
+        template_path = next((path for path in _DEFAULT_TEMPLATE_PATHS if os.path.isfile(path)), None)
         
         if not template_path:
             print("Error: No template file specified and no default template found.")
@@ -5,23 +5,61 @@ Shared utilities for HTML generation and JPEG conversion used by both
 forex and commodity HTML generation scripts.
 """
 
+import asyncio
 import os
-from typing import Optional
+from contextlib import contextmanager
+from datetime import date as date_type, timedelta
+from functools import lru_cache
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+import pandas as pd
 
-try:
-    from selenium import webdriver
-    from selenium.webdriver.firefox.options import Options as FirefoxOptions
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.common.exceptions import WebDriverException, TimeoutException
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
+# Browser libraries are heavy to import, so availability is only probed here;
+# they are imported by the functions that render, on first use.
+PLAYWRIGHT_AVAILABLE = find_spec("playwright") is not None
+SELENIUM_AVAILABLE = find_spec("selenium") is not None
+
+
+@lru_cache(maxsize=16)
+def _read_template(template_path: str, mtime_ns: int) -> str:
+    """Read a template file (cached per path and modification time)."""
+    return Path(template_path).read_text(encoding='utf-8')
+
+
+def load_template(template_path: str) -> str:
+    """
+    Load an HTML template, reusing the cached text while the file is unchanged.
+    
+    Args:
+        template_path: Path to the HTML template file
+        
+    Returns:
+        Template content
+        
+    Raises:
+        FileNotFoundError: If the template does not exist
+    """
+    try:
+        mtime_ns = os.stat(template_path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Template file not found: {template_path}")
+    return _read_template(os.path.abspath(template_path), mtime_ns)
+
+
+# Arrow icons by direction: up (green up arrow), down (red down arrow), neutral (white dash)
+_ARROW_SVGS = {
+    "up": '<svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg"><path d="M7 14L12 9L17 14H7Z" fill="currentColor"/></svg>',
+    "down": '<svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg"><path d="M7 10L12 15L17 10H7Z" fill="currentColor"/></svg>',
+    "neutral": '<svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg"><line x1="7" y1="12" x2="17" y2="12" stroke="currentColor" stroke-width="3"/></svg>',
+}
+
+
+@lru_cache(maxsize=None)
+def _arrow_div(arrow_class: str, direction: str) -> str:
+    """Build the arrow element for a class prefix and direction (built once per pair)."""
+    return f'<div class="{arrow_class} arrow-{direction}">{_ARROW_SVGS[direction]}</div>'
 
 
 def generate_arrow_html(current_value: float, previous_value: float, arrow_class: str = "arrow") -> str:
@@ -42,21 +80,183 @@ def generate_arrow_html(current_value: float, previous_value: float, arrow_class
     try:
         current = float(current_value)
         previous = float(previous_value)
-        
-        if current > previous:
-            # Value is up - green up arrow
-            return f'<div class="{arrow_class} arrow-up"><svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg"><path d="M7 14L12 9L17 14H7Z" fill="currentColor"/></svg></div>'
-        elif current < previous:
-            # Value is down - red down arrow
-            return f'<div class="{arrow_class} arrow-down"><svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg"><path d="M7 10L12 15L17 10H7Z" fill="currentColor"/></svg></div>'
-        else:
-            # No change - white dash
-            return f'<div class="{arrow_class} arrow-neutral"><svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg"><line x1="7" y1="12" x2="17" y2="12" stroke="currentColor" stroke-width="3"/></svg></div>'
     except (ValueError, TypeError):
         return ""
+    
+    if current > previous:
+        return _arrow_div(arrow_class, "up")
+    elif current < previous:
+        return _arrow_div(arrow_class, "down")
+    else:
+        return _arrow_div(arrow_class, "neutral")
+
+
+# Resolved locations of history CSVs: requested path -> existing file path
+_RESOLVED_CSV_PATHS: Dict[str, str] = {}
+
+# Parsed history CSVs indexed by date: resolved path -> (mtime_ns, DataFrame)
+_HISTORY_CACHE: Dict[str, Tuple[int, pd.DataFrame]] = {}
+
+
+def _resolve_csv_path(csv_path: str) -> Optional[str]:
+    """Resolve a CSV path as given or relative to the project root (remembered once found)."""
+    resolved = _RESOLVED_CSV_PATHS.get(csv_path)
+    if resolved is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        for candidate in (csv_path, os.path.abspath(os.path.join(script_dir, '..', csv_path))):
+            if os.path.isfile(candidate):
+                resolved = _RESOLVED_CSV_PATHS[csv_path] = candidate
+                break
+    return resolved
+
+
+def load_history_by_date(csv_path: str, load_func: Callable[[str], pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    Load a history CSV indexed by date, reusing the parsed frame while the file is unchanged.
+    
+    The path is tried as given and then relative to the project root.
+    
+    Args:
+        csv_path: Path to the history CSV file
+        load_func: Loader returning a DataFrame whose 'date' column holds datetime.date
+            objects (e.g. load_currency_history_csv or load_commodity_history_csv)
+        
+    Returns:
+        DataFrame indexed and sorted by date, or None if the file was not found or could not be loaded
+    """
+    resolved_path = _resolve_csv_path(csv_path)
+    if resolved_path is None:
+        return None
+    
+    try:
+        mtime_ns = os.stat(resolved_path).st_mtime_ns
+    except FileNotFoundError:
+        _RESOLVED_CSV_PATHS.pop(csv_path, None)
+        return None
+    
+    cached = _HISTORY_CACHE.get(resolved_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    
+    df = load_func(resolved_path)
+    if df is None:
+        return None
+    
+    # Sorted so previous-day windows can be taken as label slices
+    df_by_date = df.set_index('date').sort_index()
+    _HISTORY_CACHE[resolved_path] = (mtime_ns, df_by_date)
+    return df_by_date
+
+
+def previous_row(df_by_date: pd.DataFrame, day: date_type, columns: Dict[str, str],
+                 lookback_days: int = 7) -> Optional[Dict[str, Optional[float]]]:
+    """
+    Get the most recent row before a day with at least one valid value.
+    
+    Args:
+        df_by_date: History DataFrame from load_history_by_date
+        day: Day to look back from (excluded)
+        columns: Mapping of result key to history column (e.g. {"USD": "usd_rate"})
+        lookback_days: Number of days before day to search (default: 7)
+        
+    Returns:
+        Dictionary of result keys to values (None where missing), or None if no row was found
+    """
+    # One label slice over the sorted index instead of a per-day lookup loop
+    window = df_by_date.loc[day - timedelta(days=lookback_days):day - timedelta(days=1),
+                            list(columns.values())].dropna(how='all')
+    if window.empty:
+        return None
+    
+    row = window.iloc[-1]
+    return {key: (row[column] if pd.notna(row[column]) else None)
+            for key, column in columns.items()}
+
 
+# Page kept open per shared browser from browser_session, reused across conversions
+_session_pages: Dict[object, object] = {}
 
-def html_to_jpeg_playwright(html_path: str, jpeg_path: str, width: int = 1080, height: int = 1350) -> Optional[str]:
+
+@contextmanager
+def browser_session() -> Iterator[Optional[object]]:
+    """
+    Launch one headless Chromium browser to share across several JPEG conversions.
+    
+    Pass the yielded browser to html_to_jpeg so conversions reuse one open page
+    instead of starting a browser each time. Yields None if Playwright is not
+    available or the browser cannot be launched (conversions then launch their own).
+    
+    Yields:
+        Playwright Browser instance, or None
+    """
+    if not PLAYWRIGHT_AVAILABLE:
+        yield None
+        return
+    
+    try:
+        from playwright.sync_api import sync_playwright
+        playwright = sync_playwright().start()
+    except Exception as e:
+        print(f"  Warning: Could not start Playwright: {e}")
+        yield None
+        return
+    
+    try:
+        browser = playwright.chromium.launch(headless=True)
+    except Exception as e:
+        print(f"  Warning: Could not launch shared Chromium browser: {e}")
+        playwright.stop()
+        yield None
+        return
+    
+    try:
+        yield browser
+    finally:
+        _session_pages.pop(browser, None)
+        try:
+            browser.close()
+        finally:
+            playwright.stop()
+
+
+def _render_page(page, html_file_url: str, jpeg_path: str) -> None:
+    """Load an HTML file in a page and save it as JPEG."""
+    page.goto(html_file_url, wait_until='load', timeout=60000)
+    page.wait_for_timeout(1500)  # Give time for fonts/images to load
+    page.screenshot(path=jpeg_path, type="jpeg", quality=95, full_page=True, timeout=60000)
+
+
+def _screenshot_with_browser(browser, html_file_url: str, jpeg_path: str, width: int, height: int) -> None:
+    """Render a page in a fresh context of an open browser and save it as JPEG."""
+    context = browser.new_context(viewport={'width': width, 'height': height})
+    try:
+        _render_page(context.new_page(), html_file_url, jpeg_path)
+    finally:
+        context.close()
+
+
+def _screenshot_with_session_page(browser, html_file_url: str, jpeg_path: str, width: int, height: int) -> None:
+    """Render with the page kept open for a browser_session browser, opening it on first use."""
+    page = _session_pages.get(browser)
+    if page is None or page.is_closed():
+        page = _session_pages[browser] = browser.new_page(viewport={'width': width, 'height': height})
+    else:
+        page.set_viewport_size({'width': width, 'height': height})
+    
+    try:
+        _render_page(page, html_file_url, jpeg_path)
+    except Exception:
+        # Don't reuse a page left in an unknown state; the retry opens a new one
+        _session_pages.pop(browser, None)
+        try:
+            page.close()
+        except Exception:
+            pass
+        raise
+
+
+def html_to_jpeg_playwright(html_path: str, jpeg_path: str, width: int = 1080, height: int = 1350,
+                            browser=None) -> Optional[str]:
     """
     Convert HTML file to JPEG using Playwright with Chromium (primary method).
     Uses Chromium instead of Firefox due to Firefox Nightly compatibility issues on macOS.
@@ -66,6 +266,7 @@ def html_to_jpeg_playwright(html_path: str, jpeg_path: str, width: int = 1080, h
         jpeg_path: Path where the JPEG should be saved
         width: Width of the output image in pixels (default: 1080)
         height: Height of the output image in pixels (default: 1350)
+        browser: Optional open browser from browser_session (launches one if None)
         
     Returns:
         Path to the generated JPEG file, or None if conversion failed
@@ -80,17 +281,18 @@ def html_to_jpeg_playwright(html_path: str, jpeg_path: str, width: int = 1080, h
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             print(f"  Using Playwright with Chromium (attempt {attempt}/{MAX_RETRIES})...")
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(viewport={'width': width, 'height': height})
-                page = context.new_page()
-                page.goto(html_file_url, wait_until='load', timeout=60000)
-                page.wait_for_timeout(1500)  # Give time for fonts/images to load
-                page.screenshot(path=jpeg_path, type="jpeg", quality=95, full_page=True, timeout=60000)
-                context.close()
-                browser.close()
-                print(f"✓ JPEG generated successfully with Playwright (Chromium): {jpeg_path}")
-                return jpeg_path
+            if browser is not None and browser.is_connected():
+                _screenshot_with_session_page(browser, html_file_url, jpeg_path, width, height)
+            else:
+                from playwright.sync_api import sync_playwright
+                with sync_playwright() as p:
+                    own_browser = p.chromium.launch(headless=True)
+                    try:
+                        _screenshot_with_browser(own_browser, html_file_url, jpeg_path, width, height)
+                    finally:
+                        own_browser.close()
+            print(f"✓ JPEG generated successfully with Playwright (Chromium): {jpeg_path}")
+            return jpeg_path
         except Exception as e:
             if attempt < MAX_RETRIES:
                 print(f"    Playwright attempt {attempt} failed, retrying... ({e})")
@@ -118,6 +320,11 @@ def html_to_jpeg_selenium(html_path: str, jpeg_path: str, width: int = 1080, hei
     
     driver = None
     try:
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options as FirefoxOptions
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import WebDriverException, TimeoutException
+        
         html_abs_path = os.path.abspath(html_path)
         html_file_url = f"file://{html_abs_path.replace(os.sep, '/')}"
         
@@ -185,7 +392,8 @@ def html_to_jpeg_selenium(html_path: str, jpeg_path: str, width: int = 1080, hei
                 pass
 
 
-def html_to_jpeg(html_path: str, jpeg_path: str, width: int = 1080, height: int = 1350) -> Optional[str]:
+def html_to_jpeg(html_path: str, jpeg_path: str, width: int = 1080, height: int = 1350,
+                 browser=None) -> Optional[str]:
     """
     Convert HTML file to JPEG image using multiple fallback methods.
     Tries Playwright first (primary), then Selenium as fallback.
@@ -195,6 +403,7 @@ def html_to_jpeg(html_path: str, jpeg_path: str, width: int = 1080, height: int
         jpeg_path: Path where the JPEG should be saved
         width: Width of the output image in pixels (default: 1080)
         height: Height of the output image in pixels (default: 1350)
+        browser: Optional open browser from browser_session, reused for Playwright
         
     Returns:
         Path to the generated JPEG file, or None if conversion failed
@@ -202,7 +411,7 @@ def html_to_jpeg(html_path: str, jpeg_path: str, width: int = 1080, height: int
     # Try Playwright first (primary method)
     if PLAYWRIGHT_AVAILABLE:
         print("  Attempting conversion with Playwright...")
-        result = html_to_jpeg_playwright(html_path, jpeg_path, width, height)
+        result = html_to_jpeg_playwright(html_path, jpeg_path, width, height, browser=browser)
         if result:
             return result
     
@@ -227,3 +436,70 @@ def html_to_jpeg(html_path: str, jpeg_path: str, width: int = 1080, height: int
             print("    - Check browser binaries are installed correctly")
     
     return None
+
+
+async def _html_to_jpeg_batch_async(jobs: Sequence[Tuple[str, str]], width: int, height: int,
+                                    concurrency: int) -> List[Optional[str]]:
+    """Render HTML files to JPEG concurrently as pages of one async Chromium browser."""
+    from playwright.async_api import async_playwright
+    
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def render_one(html_path: str, jpeg_path: str) -> Optional[str]:
+            html_file_url = f"file://{os.path.abspath(html_path).replace(os.sep, '/')}"
+            async with semaphore:
+                context = await browser.new_context(viewport={'width': width, 'height': height})
+                try:
+                    page = await context.new_page()
+                    await page.goto(html_file_url, wait_until='load', timeout=60000)
+                    await page.wait_for_timeout(1500)  # Give time for fonts/images to load
+                    await page.screenshot(path=jpeg_path, type="jpeg", quality=95, full_page=True, timeout=60000)
+                    print(f"✓ JPEG generated successfully with Playwright (Chromium): {jpeg_path}")
+                    return jpeg_path
+                except Exception as e:
+                    print(f"    Playwright failed for {html_path}: {e}")
+                    return None
+                finally:
+                    await context.close()
+        
+        try:
+            return await asyncio.gather(*(render_one(html_path, jpeg_path) for html_path, jpeg_path in jobs))
+        finally:
+            await browser.close()
+
+
+def html_to_jpeg_batch(jobs: Sequence[Tuple[str, str]], width: int = 1080, height: int = 1350,
+                       concurrency: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Convert several HTML files to JPEG, rendering them concurrently in one browser.
+    
+    Uses Playwright's async API with up to `concurrency` pages in flight. Any
+    conversion that fails (or every one, if Playwright is unavailable) is retried
+    one at a time through html_to_jpeg, which includes the Selenium fallback.
+    
+    Args:
+        jobs: Sequence of (html_path, jpeg_path) pairs
+        width: Width of the output images in pixels (default: 1080)
+        height: Height of the output images in pixels (default: 1350)
+        concurrency: Maximum pages rendered at once (default: CPU count)
+        
+    Returns:
+        List with the generated JPEG path (or None if conversion failed) for each job
+    """
+    results: List[Optional[str]] = [None] * len(jobs)
+    
+    if PLAYWRIGHT_AVAILABLE and jobs:
+        concurrency = max(1, concurrency or os.cpu_count() or 1)
+        print(f"  Rendering {len(jobs)} page(s) with Playwright (up to {concurrency} at once)...")
+        try:
+            results = asyncio.run(_html_to_jpeg_batch_async(jobs, width, height, concurrency))
+        except Exception as e:
+            print(f"    Playwright batch rendering failed: {e}")
+    
+    for i, (html_path, jpeg_path) in enumerate(jobs):
+        if results[i] is None:
+            results[i] = html_to_jpeg(html_path, jpeg_path, width, height)
+    
+    return results
@@ -10,8 +10,10 @@ import os
 from datetime import datetime
 import pandas as pd
 
-# Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add project root to path (once, even when imported from another script)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.commodity_history import load_commodity_history_csv
 from src.commodity_formatter import standardize_commodity_data
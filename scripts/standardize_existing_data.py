@@ -8,13 +8,15 @@ Convert existing JSON files to the standardized format.
 import sys
 import os
 from pathlib import Path
-import json
 
-# Add parent directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add project root to path (once, even when imported from another script)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.currency_formatter import standardize_data
 from src.currency_storage import load_data
+from src.base_storage import encode_json, write_bytes
 
 
 def standardize_file(filepath: str, backup: bool = True) -> bool:
@@ -46,8 +48,7 @@ def standardize_file(filepath: str, backup: bool = True) -> bool:
             print(f"Created backup: {backup_path}")
     
     # Save standardized version
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(standardized, f, indent=2, ensure_ascii=False)
+    write_bytes(filepath, encode_json(standardized))
     
     print(f"Standardized: {filepath}")
     return True
@@ -6,11 +6,11 @@ Update CSV files from processed JSON data.
 import sys
 import os
 import json
-from datetime import datetime
 
-# Add project root to path
+# Add project root to path (once, even when imported from another script)
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.insert(0, project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.currency_storage import save_to_currency_table
 from src.currency_formatter import standardize_data
@@ -26,7 +26,7 @@ def update_csv_from_json(json_path: str):
     
     # Save to both CSV files
     print(f'Updating CSV files from {json_path}...')
-    save_to_currency_table(standardized_data)
+    save_to_currency_table(standardized_data, already_standardized=True)
     print('✓ CSV files updated successfully')
 
 if __name__ == '__main__':
@@ -4,8 +4,36 @@ Update Utilities Module
 Shared utilities for daily update scripts used by both forex and commodity updates.
 """
 
+import hashlib
+import json
+import os
+import sys
+import traceback
+from dataclasses import dataclass
 from datetime import datetime
-import pytz
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+# Cairns is in Queensland, which uses AEST (UTC+10) year-round.
+# Brisbane uses the same timezone as Cairns; resolved once at import time.
+_CAIRNS_TZ = ZoneInfo('Australia/Brisbane')
+
+# Project templates directory (scripts/ -> project root -> templates/)
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates'
+
+
+def write_lines(*lines: str) -> None:
+    """
+    Write a block of output lines with a single write and flush.
+    
+    Keeps banners to one write syscall when stdout is a pipe (cron, CI logs).
+    
+    Args:
+        *lines: Lines to write (a trailing newline is added to each)
+    """
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def get_cairns_time():
@@ -15,20 +43,220 @@ def get_cairns_time():
     Returns:
         datetime object in AEST timezone
     """
-    # Cairns is in Queensland, which uses AEST (UTC+10) year-round
-    cairns_tz = pytz.timezone('Australia/Brisbane')  # Brisbane uses same timezone as Cairns
-    return datetime.now(cairns_tz)
+    return datetime.now(_CAIRNS_TZ)
 
 
-def is_cob_time():
+def is_cob_time(cairns_time: Optional[datetime] = None):
     """
     Check if current time is close to COB (5pm Cairns time).
     
+    Args:
+        cairns_time: Current Cairns time, if already known (avoids a second clock read)
+        
     Returns:
         True if within 1 hour of 5pm AEST, False otherwise
     """
-    cairns_time = get_cairns_time()
-    hour = cairns_time.hour
+    hour = (cairns_time or get_cairns_time()).hour
     
     # Check if it's around 5pm (17:00) - allow 1 hour window
     return 16 <= hour <= 18
+
+
+@dataclass
+class PipelineSpec:
+    """
+    Parameters for one daily update pipeline (forex or mineral commodities).
+    
+    Attributes:
+        name: Short pipeline name, used for the render stamp file (e.g. "forex")
+        title: Banner title (e.g. "Currency Data Collection")
+        tracking: Comma-separated list of tracked items for the banner
+        collect: Function returning the raw collected data
+        standardize: Function standardizing the raw data
+        save_raw: Raw data writer (accepts output_dir)
+        save_daily: Daily data writer (accepts output_dir and encoded)
+        save_history: History table (CSV) writer (accepts already_standardized)
+        render: HTML/JPEG renderer called as render(template_path, output_dir, standardized_data)
+        raw_dir: Directory for raw JSON files
+        processed_dir: Directory for processed daily JSON files
+        output_dir: Base output directory for HTML generation
+        template_path: Path to the HTML template (see TEMPLATES_DIR)
+        template_exists: Whether template_path exists (checked once at import by the caller)
+        collect_label: Progress label for collection (e.g. "currency data")
+        history_label: Progress label for the history table (e.g. "currency")
+        render_label: Progress label for HTML generation (e.g. "forex")
+        previous_values: Optional lookup of the previous-day values the renderer compares
+            against for arrows (called with the YYYY-MM-DD date; included in the render digest)
+    """
+    name: str
+    title: str
+    tracking: str
+    collect: Callable[[], Dict[str, Any]]
+    standardize: Callable[[Dict[str, Any]], Dict[str, Any]]
+    save_raw: Callable[..., str]
+    save_daily: Callable[..., str]
+    save_history: Callable[..., Any]
+    render: Callable[[str, str, Dict[str, Any]], Any]
+    raw_dir: str
+    processed_dir: str
+    output_dir: str
+    template_path: Path
+    template_exists: bool
+    collect_label: str
+    history_label: str
+    render_label: str
+    previous_values: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+
+
+def compute_render_digest(standardized_data: Dict[str, Any], template_path: Path,
+                          previous_values: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Compute a digest of everything the rendered HTML depends on.
+    
+    The collection timestamp is excluded (it changes on every run but is not
+    rendered); the template modification time is included so template edits
+    trigger a re-render, and the previous-day values so a backfilled or
+    corrected previous day re-renders the arrows.
+    
+    Args:
+        standardized_data: Standardized data dictionary
+        template_path: Path to the HTML template
+        previous_values: Previous-day values the renderer compares against, if any
+        
+    Returns:
+        Hex digest string
+    """
+    payload = {key: value for key, value in standardized_data.items() if key != 'timestamp'}
+    payload['previous_values'] = previous_values
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(payload, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(str(template_path.stat().st_mtime_ns).encode('ascii'))
+    return digest.hexdigest()
+
+
+def is_render_current(stamp_path: str, digest: str) -> bool:
+    """
+    Check whether the last render used the same digest and its outputs still exist.
+    
+    Args:
+        stamp_path: Path to the render stamp file
+        digest: Digest of the data about to be rendered
+        
+    Returns:
+        True if rendering can be skipped, False otherwise
+    """
+    try:
+        with open(stamp_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return False
+    
+    if not lines or lines[0] != digest or len(lines) < 2:
+        return False
+    return all(os.path.exists(path) for path in lines[1:])
+
+
+def write_render_stamp(stamp_path: str, digest: str, output_paths: Sequence[str]) -> None:
+    """
+    Record the digest and output files of a successful render.
+    
+    Args:
+        stamp_path: Path to the render stamp file
+        digest: Digest of the rendered data
+        output_paths: Generated file paths (HTML and JPEG)
+    """
+    with open(stamp_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join([digest, *output_paths]) + "\n")
+
+
+def run_daily(spec: PipelineSpec) -> None:
+    """
+    Run a daily update pipeline: collect, standardize, save raw, cleanup,
+    save daily, save history, then render HTML/JPEG.
+    
+    Cleanup and HTML generation failures are reported as warnings and do not
+    fail the update. Any other error exits with code 1.
+    
+    Args:
+        spec: PipelineSpec describing the pipeline to run
+    """
+    cairns_time = get_cairns_time()
+    banner = [
+        "=" * 60,
+        f"AUD Daily Tracker - {spec.title}",
+        f"Tracking: {spec.tracking}",
+        "=" * 60,
+        f"Current Cairns time: {cairns_time.strftime('%Y-%m-%d %H:%M:%S %Z')}",
+        "Target time: 5:00 PM AEST (COB)",
+        "",
+    ]
+    
+    # Check if it's COB time (optional - can be run manually anytime)
+    if not is_cob_time(cairns_time):
+        banner += ["Note: Not currently COB time, but proceeding with update...", ""]
+    write_lines(*banner)
+    
+    try:
+        # Collect data
+        print(f"Collecting {spec.collect_label}...")
+        data = spec.collect()
+        
+        # Standardize data
+        from src.base_storage import encode_json
+        standardized_data = spec.standardize(data)
+        # Serialize once; the daily writer reuses this payload instead of re-encoding
+        encoded = encode_json(standardized_data)
+        
+        # Save raw data (with timestamp)
+        print("\nSaving raw data...")
+        spec.save_raw(data, output_dir=spec.raw_dir)
+        
+        # Cleanup raw files (keep max 2 per date)
+        try:
+            print("Cleaning up old raw files...")
+            from scripts.cleanup_raw_files import cleanup_raw_files
+            # Only this pipeline's directory: the other pipeline may be cleaning its own concurrently
+            cleanup_raw_files(verbose=False, raw_dirs=[spec.raw_dir])
+        except Exception as e:
+            print(f"Warning: Error during cleanup: {e}")
+            # Don't fail the update if cleanup fails
+        
+        # Save daily data (date-based filename, overwrites if exists)
+        print("Saving daily data...")
+        spec.save_daily(standardized_data, output_dir=spec.processed_dir, encoded=encoded)
+        
+        # Save to history table (CSV)
+        print(f"Saving to {spec.history_label} history table...")
+        spec.save_history(standardized_data, already_standardized=True)
+        
+        # Generate HTML from template
+        try:
+            print(f"\nGenerating {spec.render_label} HTML...")
+            if spec.template_exists:
+                # Skip rendering when nothing that feeds the HTML changed since the last run
+                previous_values = None
+                if spec.previous_values:
+                    # Same date fallback as the renderers
+                    render_date = standardized_data.get("date") or datetime.now().strftime("%Y-%m-%d")
+                    previous_values = spec.previous_values(render_date)
+                digest = compute_render_digest(standardized_data, spec.template_path, previous_values)
+                stamp_path = os.path.join(spec.output_dir, f"{spec.name}.html.hash")
+                if is_render_current(stamp_path, digest):
+                    print("✓ Data unchanged since last render, skipping HTML/JPEG generation")
+                else:
+                    result = spec.render(str(spec.template_path), spec.output_dir, standardized_data)
+                    # Only stamp complete renders so a failed JPEG is retried next run
+                    if result and all(result):
+                        write_render_stamp(stamp_path, digest, result)
+            else:
+                print(f"Warning: Template not found at {spec.template_path}, skipping HTML generation.")
+        except Exception as e:
+            print(f"Warning: Error generating HTML: {e}")
+            # Don't fail the entire update if HTML generation fails
+        
+        write_lines("", "=" * 60, "Data collection complete!", "=" * 60)
+        
+    except Exception as e:
+        print(f"\n❌ Error during data collection: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -6,13 +6,26 @@ Generic history functions that can be used by both currency and commodity histor
 
 from __future__ import annotations
 
+import csv
+import io
 import os
 import warnings
-from datetime import datetime, timezone
+from datetime import date as date_type, datetime, timezone
+from importlib.util import find_spec
 from typing import Dict, List, Tuple, Optional, Callable
 
 import pandas as pd
 
+try:
+    from .base_storage import ensure_directory_exists
+except ImportError:
+    from src.base_storage import ensure_directory_exists
+
+# Optional multithreaded CSV parser for the forex and commodity history CSVs;
+# opt in with HISTORY_FAST_IO=1 (requires pyarrow, see requirements.txt)
+PYARROW_AVAILABLE = find_spec("pyarrow") is not None
+_CSV_ENGINE = "pyarrow" if PYARROW_AVAILABLE and os.environ.get("HISTORY_FAST_IO") == "1" else None
+
 
 def _coerce_numeric(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
     """Convert columns to numeric, coercing errors to NaN."""
@@ -44,7 +57,10 @@ def load_history_csv_generic(
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"{error_name} history CSV not found: {csv_path}")
 
-    df = pd.read_csv(csv_path)
+    if _CSV_ENGINE:
+        df = pd.read_csv(csv_path, engine=_CSV_ENGINE)
+    else:
+        df = pd.read_csv(csv_path)
 
     # Check for required core columns (excluding optional ones)
     required_core = [col for col in required_columns if col not in (optional_columns or {}).keys()]
@@ -60,7 +76,9 @@ def load_history_csv_generic(
 
     # Normalize dates and timestamps
     df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    # Appended rows may differ in precision from rewritten ones; ISO8601 parses each row
+    # on its own instead of inferring one format from the first row
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", format="ISO8601")
 
     # Coerce data columns to numeric
     df = _coerce_numeric(df, data_columns)
@@ -128,38 +146,75 @@ def validate_history_generic(
     return issues
 
 
-def upsert_history_row_generic(
+def _append_history_row_fast(
     csv_path: str,
-    date: datetime,
     required_columns: Tuple[str, ...],
-    new_row_data: Dict[str, any],
-    load_func: Callable[[str], pd.DataFrame],
-    round_func: Optional[Callable[[str, any], any]] = None,
-) -> pd.DataFrame:
+    new_row: Dict[str, any],
+) -> bool:
     """
-    Insert or update a history row for a given date, returning the new DataFrame.
+    Append a row to the end of an existing history CSV without rewriting it.
+    
+    Only applies when the file header matches required_columns exactly and the
+    new date is later than the last row's date (the normal daily case), so the
+    file stays sorted and deduplicated. Only the header and the file tail are read.
     
     Args:
         csv_path: Path to the CSV file
-        date: Date for the row
         required_columns: Tuple of required column names in order
-        new_row_data: Dictionary of column_name: value pairs for the new row
-        load_func: Function to load existing CSV
-        round_func: Optional function to round values (csv_path, value) -> rounded_value
+        new_row: Prepared row (date, timestamp and data columns)
         
     Returns:
-        Updated DataFrame
+        True if the row was appended, False if a full upsert is needed
     """
+    try:
+        with open(csv_path, 'rb') as f:
+            header = f.readline().decode('utf-8').strip()
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 4096))
+            tail = f.read()
+    except (OSError, UnicodeDecodeError):
+        return False
+    
+    if header.split(',') != list(required_columns):
+        return False
+    
+    # Last non-empty line holds the latest date (file is kept sorted by date)
+    last_line = next((line for line in reversed(tail.splitlines()) if line.strip()), b'')
+    try:
+        last_date = date_type.fromisoformat(last_line.split(b',', 1)[0].decode('ascii'))
+    except (UnicodeDecodeError, ValueError):
+        # Header-only or unexpected content
+        return False
+    
+    if new_row["date"] <= last_date:
+        return False
+    
+    values = []
+    for col in required_columns:
+        value = new_row.get(col)
+        values.append('' if value is None or pd.isna(value) else value)
+    
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator=os.linesep).writerow(values)
+    with open(csv_path, 'ab') as f:
+        if not tail.endswith(b'\n'):
+            f.write(os.linesep.encode('ascii'))
+        f.write(buffer.getvalue().encode('utf-8'))
+    return True
+
+
+def _prepare_history_row(
+    csv_path: str,
+    date: datetime,
+    new_row_data: Dict[str, any],
+    round_func: Optional[Callable[[str, any], any]] = None,
+) -> Dict[str, any]:
+    """Build a history row (date, timestamp and data columns) from raw values."""
     timestamp = datetime.now(timezone.utc)
     if "timestamp" in new_row_data and new_row_data["timestamp"]:
         timestamp = new_row_data["timestamp"]
 
-    # Load existing (or create new DataFrame)
-    if os.path.exists(csv_path):
-        df = load_func(csv_path)
-    else:
-        df = pd.DataFrame(columns=required_columns)
-
     # Prepare new row with date and timestamp
     new_row = {
         "date": pd.to_datetime(date).date(),
@@ -174,13 +229,30 @@ def upsert_history_row_generic(
             new_row[col] = round_func(csv_path, value)
         else:
             new_row[col] = float(value) if value is not None else pd.NA
+    return new_row
+
+
+def _merge_history_rows(
+    csv_path: str,
+    required_columns: Tuple[str, ...],
+    new_rows: List[Dict[str, any]],
+    data_columns: List[str],
+    load_func: Callable[[str], pd.DataFrame],
+    round_func: Optional[Callable[[str, any], any]] = None,
+) -> pd.DataFrame:
+    """Merge prepared rows into the history CSV (one load and one write)."""
+    # Load existing (or create new DataFrame)
+    if os.path.exists(csv_path):
+        df = load_func(csv_path)
+    else:
+        df = pd.DataFrame(columns=required_columns)
 
     # Create new row DataFrame with compatible dtypes
     if df.empty:
-        new_df = pd.DataFrame([new_row])
+        new_df = pd.DataFrame(new_rows)
         df = new_df
     else:
-        new_df = pd.DataFrame([new_row])
+        new_df = pd.DataFrame(new_rows)
         # Align dtypes to match existing DataFrame
         for col in df.columns:
             if col in new_df.columns and col in df.columns:
@@ -191,7 +263,7 @@ def upsert_history_row_generic(
             warnings.simplefilter("ignore", FutureWarning)
             df = pd.concat([df, new_df], ignore_index=True, sort=False)
     
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", format="ISO8601")
     df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
     df = df.sort_values(["date", "timestamp"]).drop_duplicates(subset=["date"], keep="last")
     df = df.sort_values("date").reset_index(drop=True)
@@ -206,13 +278,76 @@ def upsert_history_row_generic(
     
     # Apply rounding to existing rows if specified
     if round_func:
-        for col in new_row_data.keys():
-            if col != "timestamp" and col in df.columns:
+        for col in data_columns:
+            if col in df.columns:
                 df[col] = df[col].apply(
                     lambda x: round_func(csv_path, x) if pd.notna(x) and isinstance(x, (int, float)) else x
                 )
     
     # Save back to CSV
-    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    ensure_directory_exists(os.path.dirname(csv_path))
     df.to_csv(csv_path, index=False)
     return df
+
+
+def upsert_history_row_generic(
+    csv_path: str,
+    date: datetime,
+    required_columns: Tuple[str, ...],
+    new_row_data: Dict[str, any],
+    load_func: Callable[[str], pd.DataFrame],
+    round_func: Optional[Callable[[str, any], any]] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Insert or update a history row for a given date, returning the new DataFrame.
+    
+    Args:
+        csv_path: Path to the CSV file
+        date: Date for the row
+        required_columns: Tuple of required column names in order
+        new_row_data: Dictionary of column_name: value pairs for the new row
+        load_func: Function to load existing CSV
+        round_func: Optional function to round values (csv_path, value) -> rounded_value
+        
+    Returns:
+        Updated DataFrame, or None when the row was appended to the end of the
+        existing file (new latest date) without loading it
+    """
+    new_row = _prepare_history_row(csv_path, date, new_row_data, round_func)
+
+    # Fast path: a new latest date is a plain append (O(1) instead of a full rewrite)
+    if os.path.exists(csv_path) and _append_history_row_fast(csv_path, required_columns, new_row):
+        return None
+
+    data_columns = [col for col in new_row_data if col != "timestamp"]
+    return _merge_history_rows(csv_path, required_columns, [new_row], data_columns, load_func, round_func)
+
+
+def upsert_history_rows_generic(
+    csv_path: str,
+    rows: List[Tuple[datetime, Dict[str, any]]],
+    required_columns: Tuple[str, ...],
+    load_func: Callable[[str], pd.DataFrame],
+    round_func: Optional[Callable[[str, any], any]] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Insert or update several history rows with a single load and write of the CSV.
+    
+    Args:
+        csv_path: Path to the CSV file
+        rows: List of (date, new_row_data) pairs, as for upsert_history_row_generic
+        required_columns: Tuple of required column names in order
+        load_func: Function to load existing CSV
+        round_func: Optional function to round values (csv_path, value) -> rounded_value
+        
+    Returns:
+        Updated DataFrame, or None if there were no rows
+    """
+    if not rows:
+        return None
+    
+    new_rows = [_prepare_history_row(csv_path, date, new_row_data, round_func)
+                for date, new_row_data in rows]
+    data_columns = list(dict.fromkeys(
+        col for _, new_row_data in rows for col in new_row_data if col != "timestamp"))
+    return _merge_history_rows(csv_path, required_columns, new_rows, data_columns, load_func, round_func)
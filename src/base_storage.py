@@ -4,22 +4,171 @@ Base Storage Module
 Generic storage functions that can be used by both currency and commodity storage modules.
 """
 
+import functools
 import json
+import math
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _has_non_finite(value: Any) -> bool:
+    """Return True if value contains a NaN or infinite float (at any nesting level)."""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(v) for v in value)
+    return False
+
+
+def encode_json(data: Dict[str, Any]) -> bytes:
+    """
+    Serialize data to UTF-8 encoded JSON with 2-space indentation.
+    
+    Uses orjson when available (much faster than the stdlib encoder) and falls
+    back to json.dumps, producing the same layout as json.dump(indent=2, ensure_ascii=False).
+    Data holding NaN/Infinity always goes through json.dumps: orjson would write
+    those as null, while json.dump writes NaN/Infinity and readers expect a float back.
+    
+    Args:
+        data: The data dictionary to serialize
+        
+    Returns:
+        Encoded JSON bytes
+    """
+    if ORJSON_AVAILABLE and not _has_non_finite(data):
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # orjson rejects some types the stdlib encoder accepts (e.g. float subclasses)
+            pass
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def decode_json(payload: bytes) -> Any:
+    """
+    Parse UTF-8 encoded JSON bytes.
+    
+    Uses orjson when available and falls back to json.loads, which also accepts
+    the NaN/Infinity literals json.dump wrote into older files.
+    
+    Args:
+        payload: Encoded JSON bytes
+        
+    Returns:
+        Decoded data
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(payload)
+
+
+def write_bytes(filepath: str, payload: bytes) -> None:
+    """
+    Write an encoded payload to a file with direct os.write calls.
+    
+    Skips the buffered file object layer: the payload is already fully encoded,
+    so it goes to the OS in (normally) a single write. No fsync is issued.
+    
+    Args:
+        filepath: Destination path (created or truncated)
+        payload: Bytes to write
+    """
+    # O_BINARY prevents newline translation on Windows (0 elsewhere)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(filepath, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+# Directories already created or confirmed by ensure_directory_exists in this process
+_ensured_dirs: set = set()
+
 
 def ensure_directory_exists(directory: str) -> None:
-    """Create directory if it doesn't exist."""
+    """Create directory if it doesn't exist (checked once per directory per process)."""
+    directory = os.fspath(directory)
+    if directory in _ensured_dirs:
+        return
     Path(directory).mkdir(parents=True, exist_ok=True)
+    _ensured_dirs.add(directory)
+
+
+# Same-day API responses cached by ttl_json_cache (relative to the working directory)
+FETCH_CACHE_DIR = "data/.cache"
+
+
+def ttl_json_cache(
+    name: str,
+    ttl_seconds: int = 3600,
+    cache_dir: str = FETCH_CACHE_DIR,
+    should_cache: Optional[Callable[[Any], bool]] = None
+) -> Callable:
+    """
+    Cache a fetch function's JSON result on disk for the current calendar day.
+    
+    The result is stored as {cache_dir}/{name}_{YYYY-MM-DD}.json and returned
+    instead of calling the function again while the file is younger than
+    ttl_seconds. Cache read/write problems never fail the fetch.
+    
+    Args:
+        name: Cache file prefix (e.g. "forex" or "commodities")
+        ttl_seconds: Maximum age of a cached result in seconds (default: 1 hour)
+        cache_dir: Directory holding the cache files
+        should_cache: Optional predicate; results it rejects (e.g. failed fetches) are not cached
+        
+    Returns:
+        Decorator for the fetch function
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_path = os.path.join(cache_dir, f"{name}_{datetime.now().strftime('%Y-%m-%d')}.json")
+            try:
+                if time.time() - os.stat(cache_path).st_mtime < ttl_seconds:
+                    with open(cache_path, 'rb') as f:
+                        return decode_json(f.read())
+            except (OSError, ValueError):
+                pass
+            
+            result = func(*args, **kwargs)
+            if should_cache is None or should_cache(result):
+                try:
+                    ensure_directory_exists(cache_dir)
+                    # Write then rename so readers never see a partial file
+                    tmp_path = cache_path + ".tmp"
+                    write_bytes(tmp_path, encode_json(result))
+                    os.replace(tmp_path, cache_path)
+                except OSError as e:
+                    print(f"⚠ Could not write fetch cache {cache_path}: {e}")
+            return result
+        return wrapper
+    return decorator
 
 
 def save_raw_data_generic(
     data: Dict[str, Any],
     output_dir: str,
-    filename_prefix: str = "data"
+    filename_prefix: str = "data",
+    encoded: Optional[bytes] = None
 ) -> str:
     """
     Save raw data to a JSON file with timestamp.
@@ -28,6 +177,8 @@ def save_raw_data_generic(
         data: The data dictionary to save
         output_dir: Directory to save the file
         filename_prefix: Prefix for the filename (e.g., "aud_data" or "commodity_data")
+        encoded: Optional pre-serialized JSON of data (see encode_json). When provided,
+            it is written as-is instead of serializing data again.
         
     Returns:
         Path to the saved file
@@ -40,8 +191,9 @@ def save_raw_data_generic(
     filepath = os.path.join(output_dir, filename)
     
     # Save to JSON
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    if encoded is None:
+        encoded = encode_json(data)
+    write_bytes(filepath, encoded)
     
     print(f"Data saved to: {filepath}")
     return filepath
@@ -51,39 +203,61 @@ def save_daily_data_generic(
     data: Dict[str, Any],
     output_dir: str,
     standardize_func: Callable[[Dict[str, Any]], Dict[str, Any]],
-    filename_prefix: str = "daily"
+    filename_prefix: str = "daily",
+    encoded: Optional[bytes] = None
 ) -> str:
     """
     Save daily data with date-based filename.
     Data is standardized before saving to ensure consistent format.
+    An existing file holding the same data (apart from the timestamp) is left as is.
     
     Args:
         data: The data dictionary to save
         output_dir: Directory to save the file
         standardize_func: Function to standardize the data
         filename_prefix: Prefix for the filename (e.g., "aud_daily" or "commodity_daily")
+        encoded: Optional pre-serialized JSON of already standardized data (see encode_json).
+            When provided, standardization and serialization are skipped.
         
     Returns:
         Path to the saved file
     """
     ensure_directory_exists(output_dir)
     
-    # Standardize data structure before saving
-    standardized_data = standardize_func(data)
+    # Standardize data structure before saving (caller already did it if encoded is given)
+    standardized_data = data if encoded is not None else standardize_func(data)
     
     # Create filename with date only
     date_str = standardized_data.get("date") or datetime.now().strftime("%Y-%m-%d")
     filename = f"{filename_prefix}_{date_str}.json"
     filepath = os.path.join(output_dir, filename)
     
+    # Reruns for a date usually produce the same data with a new timestamp; keep the file then
+    if _matches_saved_data(filepath, standardized_data):
+        print(f"Daily data unchanged, keeping: {filepath}")
+        return filepath
+    
     # Save to JSON
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(standardized_data, f, indent=2, ensure_ascii=False)
+    if encoded is None:
+        encoded = encode_json(standardized_data)
+    write_bytes(filepath, encoded)
     
     print(f"Daily data saved to: {filepath}")
     return filepath
 
 
+def _matches_saved_data(filepath: str, data: Dict[str, Any]) -> bool:
+    """Check whether a saved daily file holds the same data, ignoring the timestamp."""
+    try:
+        with open(filepath, 'rb') as f:
+            existing = decode_json(f.read())
+    except (OSError, ValueError):
+        return False
+    if not isinstance(existing, dict) or existing.keys() != data.keys():
+        return False
+    return all(existing[key] == value for key, value in data.items() if key != "timestamp")
+
+
 def load_data_generic(filepath: str) -> Optional[Dict[str, Any]]:
     """
     Load data from a JSON file.
@@ -94,13 +268,12 @@ def load_data_generic(filepath: str) -> Optional[Dict[str, Any]]:
     Returns:
         Loaded data dictionary, or None if file doesn't exist
     """
-    if not os.path.exists(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            return decode_json(f.read())
+    except FileNotFoundError:
         print(f"File not found: {filepath}")
         return None
-    
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
     except Exception as e:
         print(f"Error loading file {filepath}: {e}")
         return None
@@ -7,6 +7,7 @@ Tracks: Gold, Silver, Copper, Aluminium, Nickel in AUD.
 
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import os
@@ -25,6 +26,13 @@ except ImportError:
         print("Warning: Could not import settings. Make sure config/settings.py exists.")
         settings = None
 
+try:
+    from .base_storage import ttl_json_cache
+    from .formatter_utils import parse_ymd
+except ImportError:
+    from src.base_storage import ttl_json_cache
+    from src.formatter_utils import parse_ymd
+
 
 def get_usd_aud_rate() -> float:
     """
@@ -89,7 +97,7 @@ def fetch_metals_dev_data() -> Optional[Dict[str, Any]]:
         return None
 
 
-def extract_commodity_prices(api_data: Dict[str, Any]) -> Dict[str, Any]:
+def extract_commodity_prices(api_data: Dict[str, Any], aud_per_usd: Optional[float] = None) -> Dict[str, Any]:
     """
     Extract commodity prices from Metals.Dev API response.
     
@@ -103,6 +111,7 @@ def extract_commodity_prices(api_data: Dict[str, Any]) -> Dict[str, Any]:
     
     Args:
         api_data: Response from Metals.Dev API (prices in AUD)
+        aud_per_usd: Optional AUD per USD rate already fetched (fetched here if None)
         
     Returns:
         Dictionary with commodity prices in our standard format
@@ -110,7 +119,8 @@ def extract_commodity_prices(api_data: Dict[str, Any]) -> Dict[str, Any]:
     metals = api_data.get("metals", {})
     
     # Get USD/AUD rate for price_usd calculation (optional, for reference)
-    aud_per_usd = get_usd_aud_rate()
+    if aud_per_usd is None:
+        aud_per_usd = get_usd_aud_rate()
     
     date_str = datetime.now().strftime("%Y-%m-%d")
     timestamp_str = datetime.now().isoformat()
@@ -166,15 +176,30 @@ def extract_commodity_prices(api_data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _all_prices_fetched(data: Dict[str, Any]) -> bool:
+    """Check that a fetch_commodity_prices result has no failed commodities (worth caching)."""
+    commodities = data.get("commodities") or {}
+    return bool(commodities) and not any("error" in entry for entry in commodities.values())
+
+
+@ttl_json_cache("commodities", should_cache=_all_prices_fetched)
 def fetch_commodity_prices() -> Dict[str, Any]:
     """
     Fetch mineral commodity prices in AUD from Metals.Dev API.
     Tracks: Gold, Silver, Copper, Aluminium, Nickel.
     
+    Complete results are cached in data/.cache for an hour, so repeated runs
+    on the same day reuse them instead of calling the API again.
+    
     Returns:
         Dictionary with commodity prices and metadata
     """
-    api_data = fetch_metals_dev_data()
+    # Both requests are independent and network-bound, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        api_future = executor.submit(fetch_metals_dev_data)
+        rate_future = executor.submit(get_usd_aud_rate)
+        api_data = api_future.result()
+        aud_per_usd = rate_future.result()
     
     if not api_data:
         # Return empty structure on failure
@@ -190,7 +215,7 @@ def fetch_commodity_prices() -> Dict[str, Any]:
             }
         }
     
-    return extract_commodity_prices(api_data)
+    return extract_commodity_prices(api_data, aud_per_usd=aud_per_usd)
 
 
 def fetch_metals_dev_timeseries(start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
@@ -342,6 +367,61 @@ def extract_timeseries_commodity_prices(api_data: Dict[str, Any], date_str: str)
     }
 
 
+# Yahoo Finance tickers for base metals futures
+# Note: Aluminium and Nickel have no direct futures on Yahoo Finance; these would
+# typically require LME (London Metal Exchange) data or other sources
+_YFINANCE_TICKERS = {
+    "COPPER": "HG=F",  # Copper Futures (USD per pound)
+}
+
+# Pounds per metric tonne (copper futures are quoted per pound)
+_LB_PER_MT = 2204.62
+
+
+def _copper_from_history(hist, date_str: str, aud_per_usd: float) -> Optional[Dict[str, Any]]:
+    """
+    Build the COPPER entry for a date from a yfinance history frame.
+    
+    Uses the closing price of the trading day closest to the date (within 5 days).
+    
+    Args:
+        hist: yfinance history DataFrame with a timezone-naive index
+        date_str: Date in YYYY-MM-DD format
+        aud_per_usd: AUD per USD conversion rate
+    
+    Returns:
+        Commodity entry in our standard format, or None if no nearby data
+    """
+    target_date = parse_ymd(date_str).date()
+    
+    # Find the row closest to our target date
+    closest_idx = None
+    min_diff = None
+    for idx in hist.index:
+        diff = abs((idx.date() - target_date).days)
+        if min_diff is None or diff < min_diff:
+            min_diff = diff
+            closest_idx = idx
+    
+    if closest_idx is None or min_diff > 5:  # Within 5 days
+        print(f"  Warning: No COPPER data found near {date_str}")
+        return None
+    
+    # Get closing price (in USD per pound) and convert to USD per metric tonne, then AUD
+    price_usd_per_mt = hist.loc[closest_idx, 'Close'] * _LB_PER_MT
+    price_aud_per_mt = price_usd_per_mt * aud_per_usd
+    
+    print(f"  ✓ COPPER: ${price_aud_per_mt:,.2f} AUD/mt (from yfinance, date: {closest_idx.date()})")
+    return {
+        "price_usd": price_usd_per_mt,
+        "price_aud": price_aud_per_mt,
+        "unit": "mt",
+        "currency": "AUD",
+        "date": date_str,
+        "source": "yfinance"
+    }
+
+
 def fetch_base_metals_yfinance(date_str: str) -> Dict[str, Any]:
     """
     Fetch base metals prices (Copper, Aluminium, Nickel) from yfinance for a specific date.
@@ -353,81 +433,58 @@ def fetch_base_metals_yfinance(date_str: str) -> Dict[str, Any]:
     Returns:
         Dictionary with base metals prices in AUD
     """
+    return fetch_base_metals_yfinance_range(date_str, date_str).get(date_str, {})
+
+
+def fetch_base_metals_yfinance_range(start_date: str, end_date: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch base metals prices from yfinance for every date in a range.
+    
+    Makes one history request per ticker (and one USD/AUD lookup) for the whole
+    range instead of one per date.
+    
+    Args:
+        start_date: First date in YYYY-MM-DD format
+        end_date: Last date in YYYY-MM-DD format
+    
+    Returns:
+        Dictionary mapping each date (YYYY-MM-DD) to its base metals prices in AUD
+    """
     try:
         import yfinance as yf
     except ImportError:
         print("Warning: yfinance not installed. Install with: pip install yfinance")
         return {}
     
+    start_obj = parse_ymd(start_date)
+    end_obj = parse_ymd(end_date)
+    dates = [(start_obj + timedelta(days=offset)).strftime("%Y-%m-%d")
+             for offset in range((end_obj - start_obj).days + 1)]
+    base_metals = {date_str: {} for date_str in dates}
+    
     # Get USD/AUD exchange rate for conversion
     aud_per_usd = get_usd_aud_rate()
     
-    base_metals = {}
-    
-    # Yahoo Finance tickers for base metals futures
-    # Note: Some metals may not have direct futures, we'll try common ones
-    tickers = {
-        "COPPER": "HG=F",  # Copper Futures
-        # Aluminium and Nickel may not have direct futures on Yahoo Finance
-        # We'll try alternative tickers or leave as None
-    }
-    
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        # yfinance needs a date range, so get a few days around the target date
-        start_date = (date_obj - timedelta(days=5)).strftime("%Y-%m-%d")
-        end_date = (date_obj + timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        # Fetch copper price
-        if "COPPER" in tickers:
-            try:
-                ticker = yf.Ticker(tickers["COPPER"])
-                # Get historical data for the date range
-                hist = ticker.history(start=start_date, end=end_date, interval="1d")
-                
-                if not hist.empty:
-                    # Find the closest date to our target date
-                    hist.index = hist.index.tz_localize(None)  # Remove timezone
-                    target_date = date_obj.date()
-                    
-                    # Find the row closest to our target date
-                    closest_idx = None
-                    min_diff = None
-                    for idx in hist.index:
-                        diff = abs((idx.date() - target_date).days)
-                        if min_diff is None or diff < min_diff:
-                            min_diff = diff
-                            closest_idx = idx
-                    
-                    if closest_idx is not None and min_diff <= 5:  # Within 5 days
-                        # Get closing price (in USD per pound typically)
-                        price_usd_per_lb = hist.loc[closest_idx, 'Close']
-                        # Convert to USD per metric tonne (1 metric tonne = 2204.62 pounds)
-                        price_usd_per_mt = price_usd_per_lb * 2204.62
-                        # Convert to AUD
-                        price_aud_per_mt = price_usd_per_mt * aud_per_usd
-                        
-                        base_metals["COPPER"] = {
-                            "price_usd": price_usd_per_mt,
-                            "price_aud": price_aud_per_mt,
-                            "unit": "mt",
-                            "currency": "AUD",
-                            "date": date_str,
-                            "source": "yfinance"
-                        }
-                        print(f"  ✓ COPPER: ${price_aud_per_mt:,.2f} AUD/mt (from yfinance, date: {closest_idx.date()})")
-                    else:
-                        print(f"  Warning: No COPPER data found near {date_str}")
-            except Exception as e:
-                print(f"  Warning: Could not fetch COPPER from yfinance: {e}")
-        
-        # For Aluminium, try LME aluminium price (may need different approach)
-        # Yahoo Finance doesn't have direct aluminium futures, but we can try alternative sources
-        # For now, we'll note it's not available via yfinance
+        # yfinance needs a date range, so pad it by a few days for the closest-day match
+        history_start = (start_obj - timedelta(days=5)).strftime("%Y-%m-%d")
+        history_end = (end_obj + timedelta(days=1)).strftime("%Y-%m-%d")
         
-        # For Nickel, try LME nickel if available
-        # Yahoo Finance doesn't have direct nickel futures either
-        # These would typically require LME (London Metal Exchange) data or other sources
+        # Fetch copper prices
+        try:
+            ticker = yf.Ticker(_YFINANCE_TICKERS["COPPER"])
+            hist = ticker.history(start=history_start, end=history_end, interval="1d")
+            
+            if hist.empty:
+                print(f"  Warning: No COPPER data found between {start_date} and {end_date}")
+            else:
+                hist.index = hist.index.tz_localize(None)  # Remove timezone
+                for date_str in dates:
+                    copper = _copper_from_history(hist, date_str, aud_per_usd)
+                    if copper:
+                        base_metals[date_str]["COPPER"] = copper
+        except Exception as e:
+            print(f"  Warning: Could not fetch COPPER from yfinance: {e}")
             
     except Exception as e:
         print(f"Warning: Error fetching base metals from yfinance: {e}")
@@ -5,7 +5,7 @@ Standardizes commodity data structure and provides formatting utilities.
 """
 
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Import formatter utilities
 try:
@@ -14,13 +14,15 @@ except ImportError:
     from src.formatter_utils import extract_date_from_data
 
 
-def standardize_commodity_data(data: Dict[str, Any]) -> Dict[str, Any]:
+def standardize_commodity_data(data: Dict[str, Any], assume_date: Optional[str] = None) -> Dict[str, Any]:
     """
     Standardize commodity data structure to ensure consistent format.
     Handles: GOLD, SILVER, COPPER, ALUMINIUM, NICKEL
     
     Args:
         data: Raw data dictionary from collector
+        assume_date: Optional date (YYYY-MM-DD) to use for the data and every
+                     commodity, skipping date extraction (for backfilling a known date)
         
     Returns:
         Standardized data dictionary
@@ -31,8 +33,11 @@ def standardize_commodity_data(data: Dict[str, Any]) -> Dict[str, Any]:
         "commodities": {}
     }
     
-    # Extract date using shared utility
-    standardized["date"] = extract_date_from_data(data, data_key="commodities")
+    # Extract date using shared utility (unless the caller already knows it)
+    if assume_date is not None:
+        standardized["date"] = assume_date
+    else:
+        standardized["date"] = extract_date_from_data(data, data_key="commodities")
     
     # Standardize commodities (GOLD, SILVER, COPPER, LITHIUM, IRON_ORE)
     if "commodities" in data:
@@ -50,7 +55,7 @@ def standardize_commodity_data(data: Dict[str, Any]) -> Dict[str, Any]:
                         "price_usd": info.get("price_usd"),
                         "unit": info.get("unit"),
                         "currency": info.get("currency", "AUD"),
-                        "date": info.get("date", standardized["date"]),
+                        "date": assume_date or info.get("date", standardized["date"]),
                         "source": info.get("source", "unknown")
                     }
                 else:
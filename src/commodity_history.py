@@ -9,20 +9,22 @@ from __future__ import annotations
 
 import pandas as pd
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 # Import base history utilities
 try:
     from .base_history import (
         load_history_csv_generic,
         validate_history_generic,
-        upsert_history_row_generic
+        upsert_history_row_generic,
+        upsert_history_rows_generic
     )
 except ImportError:
     from src.base_history import (
         load_history_csv_generic,
         validate_history_generic,
-        upsert_history_row_generic
+        upsert_history_row_generic,
+        upsert_history_rows_generic
     )
 
 # Expected CSV columns
@@ -81,9 +83,10 @@ def upsert_commodity_history_row(
     aluminium_price: float | None = None,
     nickel_price: float | None = None,
     timestamp: datetime | None = None,
-) -> pd.DataFrame:
+) -> Optional[pd.DataFrame]:
     """
-    Insert or update a commodity row for a given date, returning the new DataFrame.
+    Insert or update a commodity row for a given date, returning the new DataFrame
+    (None when the row was appended as the new latest date without a rewrite).
     """
     new_row_data = {
         "gold_price": gold_price,
@@ -102,3 +105,23 @@ def upsert_commodity_history_row(
         load_func=load_commodity_history_csv,
         round_func=None
     )
+
+
+def upsert_commodity_history_rows(
+    csv_path: str,
+    rows: List[Tuple[datetime, Dict[str, float | None]]],
+) -> Optional[pd.DataFrame]:
+    """
+    Insert or update several commodity rows with one read and one write of the CSV.
+
+    Each row is a (date, values) pair where values holds the upsert_commodity_history_row
+    keyword arguments (gold_price, ..., nickel_price, timestamp).
+    """
+    return upsert_history_rows_generic(
+        csv_path=csv_path,
+        rows=[(date, {**values, "timestamp": values.get("timestamp") or datetime.now(timezone.utc)})
+              for date, values in rows],
+        required_columns=REQUIRED_COLUMNS,
+        load_func=load_commodity_history_csv,
+        round_func=None
+    )
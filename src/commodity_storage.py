@@ -5,8 +5,9 @@ Handles saving and loading commodity data to/from files and tables.
 """
 
 import os
+import traceback
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # Import formatter for standardization
 try:
@@ -21,14 +22,20 @@ except ImportError:
         except ImportError:
             from src.currency_formatter import standardize_data as standardize_commodity_data
 
+try:
+    from .formatter_utils import parse_ymd
+except ImportError:
+    from src.formatter_utils import parse_ymd
+
 # Import commodity history for table storage
 try:
-    from .commodity_history import upsert_commodity_history_row
+    from .commodity_history import upsert_commodity_history_row, upsert_commodity_history_rows
 except ImportError:
     try:
-        from src.commodity_history import upsert_commodity_history_row
+        from src.commodity_history import upsert_commodity_history_row, upsert_commodity_history_rows
     except ImportError:
         upsert_commodity_history_row = None
+        upsert_commodity_history_rows = None
 
 # Import base storage utilities
 try:
@@ -49,21 +56,22 @@ except ImportError:
     )
 
 
-def save_raw_commodity_data(data: Dict[str, Any], output_dir: str = "data/commodities_data/raw") -> str:
+def save_raw_commodity_data(data: Dict[str, Any], output_dir: str = "data/commodities_data/raw", encoded: Optional[bytes] = None) -> str:
     """
     Save raw commodity data to a JSON file.
     
     Args:
         data: The data dictionary to save
         output_dir: Directory to save the file
+        encoded: Optional pre-serialized JSON payload to write as-is
         
     Returns:
         Path to the saved file
     """
-    return save_raw_data_generic(data, output_dir, filename_prefix="commodity_data")
+    return save_raw_data_generic(data, output_dir, filename_prefix="commodity_data", encoded=encoded)
 
 
-def save_daily_commodity_data(data: Dict[str, Any], output_dir: str = "data/commodities_data/processed") -> str:
+def save_daily_commodity_data(data: Dict[str, Any], output_dir: str = "data/commodities_data/processed", encoded: Optional[bytes] = None) -> str:
     """
     Save daily commodity data with date-based filename.
     Data is standardized before saving to ensure consistent format.
@@ -71,6 +79,7 @@ def save_daily_commodity_data(data: Dict[str, Any], output_dir: str = "data/comm
     Args:
         data: The data dictionary to save
         output_dir: Directory to save the file
+        encoded: Optional pre-serialized JSON payload to write as-is
         
     Returns:
         Path to the saved file
@@ -79,7 +88,8 @@ def save_daily_commodity_data(data: Dict[str, Any], output_dir: str = "data/comm
         data,
         output_dir,
         standardize_func=standardize_commodity_data,
-        filename_prefix="commodity_daily"
+        filename_prefix="commodity_daily",
+        encoded=encoded
     )
 
 
@@ -109,7 +119,52 @@ def load_latest_commodity_data(data_dir: str = "data/commodities_data/processed"
     return load_latest_data_generic(data_dir, filename_pattern="commodity_daily_*.json")
 
 
-def save_to_commodity_table(data: Dict[str, Any], csv_path: str = "data/commodities_data/processed/commodity_daily.csv") -> str:
+def _commodity_table_row(standardized_data: Dict[str, Any]) -> Tuple[datetime, Dict[str, Any]]:
+    """
+    Extract the history table row (date and column values) from standardized data.
+    
+    Args:
+        standardized_data: Standardized data dictionary with commodities
+        
+    Returns:
+        Tuple of (date, keyword values for upsert_commodity_history_row)
+    """
+    # Extract date
+    date_str = standardized_data.get("date") or datetime.now().strftime("%Y-%m-%d")
+    try:
+        date_obj = parse_ymd(date_str)
+    except:
+        date_obj = datetime.now()
+    
+    # Extract timestamp
+    timestamp_str = standardized_data.get("timestamp")
+    if timestamp_str:
+        try:
+            timestamp_obj = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+        except:
+            timestamp_obj = datetime.now()
+    else:
+        timestamp_obj = datetime.now()
+    
+    # Extract commodity prices
+    commodities = standardized_data.get("commodities", {})
+    gold_price = (commodities.get("GOLD") or {}).get("price_aud")
+    silver_price = (commodities.get("SILVER") or {}).get("price_aud")
+    copper_price = (commodities.get("COPPER") or {}).get("price_aud")
+    aluminium_price = (commodities.get("ALUMINIUM") or {}).get("price_aud")
+    nickel_price = (commodities.get("NICKEL") or {}).get("price_aud")
+    
+    return date_obj, {
+        "gold_price": gold_price,
+        "silver_price": silver_price,
+        "copper_price": copper_price,
+        "aluminium_price": aluminium_price,
+        "nickel_price": nickel_price,
+        "timestamp": timestamp_obj
+    }
+
+
+def save_to_commodity_table(data: Dict[str, Any], csv_path: str = "data/commodities_data/processed/commodity_daily.csv", already_standardized: bool = False) -> str:
     """
     Save commodity data to the daily table (CSV).
     Each day is a new row with timestamps for daily tracking.
@@ -117,6 +172,7 @@ def save_to_commodity_table(data: Dict[str, Any], csv_path: str = "data/commodit
     Args:
         data: Standardized data dictionary with commodities
         csv_path: Path to the daily commodity CSV file
+        already_standardized: True if data came from the standardizer (skips standardizing again)
         
     Returns:
         Path to the saved CSV file
@@ -127,54 +183,58 @@ def save_to_commodity_table(data: Dict[str, Any], csv_path: str = "data/commodit
     
     try:
         # Standardize data if needed
-        standardized_data = standardize_commodity_data(data)
+        standardized_data = data if already_standardized else standardize_commodity_data(data)
+        date_obj, values = _commodity_table_row(standardized_data)
         
-        # Extract date
-        date_str = standardized_data.get("date") or datetime.now().strftime("%Y-%m-%d")
-        try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        except:
-            date_obj = datetime.now()
+        # Save to CSV
+        upsert_commodity_history_row(csv_path=csv_path, date=date_obj, **values)
         
-        # Extract timestamp
-        timestamp_str = standardized_data.get("timestamp")
-        if timestamp_str:
-            try:
-                timestamp_obj = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-            except:
-                timestamp_obj = datetime.now()
+        # Verify the CSV was created/updated
+        if os.path.exists(csv_path):
+            print(f"✓ Commodity data saved to table: {csv_path}")
         else:
-            timestamp_obj = datetime.now()
+            print(f"⚠ Warning: CSV file was not created at {csv_path}")
         
-        # Extract commodity prices
-        commodities = standardized_data.get("commodities", {})
-        gold_price = commodities.get("GOLD", {}).get("price_aud") if commodities.get("GOLD") else None
-        silver_price = commodities.get("SILVER", {}).get("price_aud") if commodities.get("SILVER") else None
-        copper_price = commodities.get("COPPER", {}).get("price_aud") if commodities.get("COPPER") else None
-        aluminium_price = commodities.get("ALUMINIUM", {}).get("price_aud") if commodities.get("ALUMINIUM") else None
-        nickel_price = commodities.get("NICKEL", {}).get("price_aud") if commodities.get("NICKEL") else None
+        return csv_path
+    except Exception as e:
+        print(f"❌ Error saving to commodity table: {e}")
+        traceback.print_exc()
+        raise
+
+
+def save_to_commodity_table_bulk(data_list: List[Dict[str, Any]], csv_path: str = "data/commodities_data/processed/commodity_daily.csv", already_standardized: bool = False) -> str:
+    """
+    Save several days of commodity data to the daily table (CSV) in one write.
+    
+    Args:
+        data_list: Standardized data dictionaries with commodities (one per date)
+        csv_path: Path to the daily commodity CSV file
+        already_standardized: True if data came from the standardizer (skips standardizing again)
         
-        # Save to CSV
-        upsert_commodity_history_row(
-            csv_path=csv_path,
-            date=date_obj,
-            gold_price=gold_price,
-            silver_price=silver_price,
-            copper_price=copper_price,
-            aluminium_price=aluminium_price,
-            nickel_price=nickel_price,
-            timestamp=timestamp_obj
-        )
+    Returns:
+        Path to the saved CSV file
+    """
+    if not upsert_commodity_history_rows:
+        print("Warning: commodity_history module not available. Skipping table save.")
+        return csv_path
+    
+    if not data_list:
+        return csv_path
+    
+    try:
+        rows = [_commodity_table_row(data if already_standardized else standardize_commodity_data(data))
+                for data in data_list]
+        
+        # Save to CSV (single load and write for all rows)
+        upsert_commodity_history_rows(csv_path, rows)
         
-        # Verify the CSV was created/updated
         if os.path.exists(csv_path):
-            print(f"✓ Commodity data saved to table: {csv_path}")
+            print(f"✓ Commodity data for {len(rows)} date(s) saved to table: {csv_path}")
         else:
             print(f"⚠ Warning: CSV file was not created at {csv_path}")
         
         return csv_path
     except Exception as e:
         print(f"❌ Error saving to commodity table: {e}")
-        import traceback
         traceback.print_exc()
         raise
@@ -6,9 +6,11 @@ Tracks: USD, EUR, CNY, SGD, JPY against AUD.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Union
 import os
 import sys
 
@@ -24,11 +26,34 @@ except ImportError:
         pass
     settings = MinimalSettings()
 
+try:
+    from .base_storage import ttl_json_cache
+except ImportError:
+    from src.base_storage import ttl_json_cache
+
+
+# Currencies fetched per date by collect_historical_data_for_date (one request each)
+HISTORICAL_CURRENCIES = ("USD", "EUR", "CNY", "SGD", "JPY")
+
+# Connections kept per host by the shared session; also bounds concurrent requests
+_HTTP_POOL_MAXSIZE = 20
 
+# Dates that can be collected concurrently without overflowing the connection pool
+MAX_CONCURRENT_DATES = _HTTP_POOL_MAXSIZE // len(HISTORICAL_CURRENCIES)
+
+# Shared HTTP session so repeated and concurrent requests reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=_HTTP_POOL_MAXSIZE))
+
+
+@ttl_json_cache("forex", should_cache=lambda data: "error" not in data and bool(data.get("currencies")))
 def fetch_currency_rates() -> Dict[str, Any]:
     """
     Fetch AUD exchange rates against major currencies (USD, EUR, CNY, SGD, JPY).
     
+    Successful results are cached in data/.cache for an hour, so repeated runs
+    on the same day reuse them instead of calling the API again.
+    
     Returns:
         Dictionary with currency rates and metadata
     """
@@ -39,7 +64,7 @@ def fetch_currency_rates() -> Dict[str, Any]:
     
     # Using a free API (exchangerate-api.com)
     try:
-        response = requests.get("https://api.exchangerate-api.com/v4/latest/AUD", timeout=10)
+        response = _SESSION.get("https://api.exchangerate-api.com/v4/latest/AUD", timeout=10)
         response.raise_for_status()
         rates = response.json()
         
@@ -58,7 +83,24 @@ def fetch_currency_rates() -> Dict[str, Any]:
     return data
 
 
-def fetch_historical_currency_rate(date: str, base: str = "AUD", target: str = "USD") -> Optional[float]:
+class _FetchFailed:
+    """Result of a historical rate lookup where every API request errored (falsy, like None)."""
+    __slots__ = ()
+    
+    def __bool__(self) -> bool:
+        return False
+    
+    def __repr__(self) -> str:
+        return "FETCH_FAILED"
+
+
+# Returned by fetch_historical_currency_rate when no API could be reached, as opposed
+# to None when an API answered without a rate (e.g. weekends and holidays)
+FETCH_FAILED = _FetchFailed()
+
+
+def fetch_historical_currency_rate(date: str, base: str = "AUD", target: str = "USD",
+                                   throttle: Optional[Callable[[], None]] = None) -> Union[float, None, _FetchFailed]:
     """
     Fetch historical exchange rate for a specific date.
     
@@ -66,15 +108,19 @@ def fetch_historical_currency_rate(date: str, base: str = "AUD", target: str = "
         date: Date in YYYY-MM-DD format
         base: Base currency (default: AUD)
         target: Target currency (default: USD)
+        throttle: Optional callable run before each HTTP request (e.g. a rate limiter's wait)
         
     Returns:
-        Exchange rate or None if not available
+        Exchange rate, None if the API answered without a rate for the date,
+        or FETCH_FAILED if every request errored (network, rate limit, bad response)
     """
     # Try frankfurter.app API (free, no API key required, supports historical data)
     try:
         url = f"https://api.frankfurter.app/{date}"
         params = {"base": base, "symbols": target}
-        response = requests.get(url, params=params, timeout=10)
+        if throttle:
+            throttle()
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -85,7 +131,9 @@ def fetch_historical_currency_rate(date: str, base: str = "AUD", target: str = "
         try:
             url = f"https://api.exchangerate.host/{date}"
             params = {"base": base, "symbols": target}
-            response = requests.get(url, params=params, timeout=10)
+            if throttle:
+                throttle()
+            response = _SESSION.get(url, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -93,20 +141,23 @@ def fetch_historical_currency_rate(date: str, base: str = "AUD", target: str = "
                 return float(data["rates"][target])
         except Exception as e2:
             print(f"Error fetching historical rate for {date}: {e2}")
+            return FETCH_FAILED
     
     return None
 
 
-def collect_historical_data_for_date(date: str) -> Dict[str, Any]:
+def collect_historical_data_for_date(date: str, throttle: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
     """
     Collect historical currency data for a specific date.
     Fetches all tracked currencies: USD, EUR, CNY, SGD, JPY.
     
     Args:
         date: Date in YYYY-MM-DD format
+        throttle: Optional callable run before each HTTP request (e.g. a rate limiter's wait)
         
     Returns:
-        Dictionary with currency rates and metadata (similar to collect_all_data format)
+        Dictionary with currency rates and metadata (similar to collect_all_data format).
+        Currencies whose requests errored are listed under "failed_currencies".
     """
     currencies_data = {
         "timestamp": datetime.now().isoformat(),
@@ -114,10 +165,17 @@ def collect_historical_data_for_date(date: str) -> Dict[str, Any]:
     }
     
     # Fetch all tracked currencies for the historical date
-    currencies_to_fetch = ["USD", "EUR", "CNY", "SGD", "JPY"]
+    currencies_to_fetch = HISTORICAL_CURRENCIES
     
-    for currency in currencies_to_fetch:
-        rate = fetch_historical_currency_rate(date, "AUD", currency)
+    # Requests are independent and network-bound, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=len(currencies_to_fetch)) as executor:
+        rates = list(executor.map(
+            lambda currency: fetch_historical_currency_rate(date, "AUD", currency, throttle=throttle),
+            currencies_to_fetch
+        ))
+    
+    failed_currencies = []
+    for currency, rate in zip(currencies_to_fetch, rates):
         if rate:
             currencies_data["currencies"][currency] = {
                 "rate": rate,
@@ -125,13 +183,18 @@ def collect_historical_data_for_date(date: str) -> Dict[str, Any]:
                 "date": date
             }
         else:
+            if rate is FETCH_FAILED:
+                failed_currencies.append(currency)
             print(f"Warning: Could not fetch {currency} rate for {date}")
     
     # Return in same format as collect_all_data
-    return {
+    result = {
         "collection_date": datetime.now().isoformat(),
         "currencies": currencies_data
     }
+    if failed_currencies:
+        result["failed_currencies"] = failed_currencies
+    return result
 
 
 def collect_historical_quarterly_data(start_year: int = 1966, end_year: Optional[int] = None) -> Dict[str, Any]:
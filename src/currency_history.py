@@ -11,7 +11,7 @@ from __future__ import annotations
 import os
 import pandas as pd
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 # Import base history utilities
 try:
@@ -86,9 +86,10 @@ def upsert_currency_history_row(
     sgd_rate: float | None = None,
     jpy_rate: float | None = None,
     timestamp: datetime | None = None,
-) -> pd.DataFrame:
+) -> Optional[pd.DataFrame]:
     """
-    Insert or update a currency row for a given date, returning the new DataFrame.
+    Insert or update a currency row for a given date, returning the new DataFrame
+    (None when the row was appended as the new latest date without a rewrite).
     """
     # Round rates to 3 decimal places for currency_daily.csv
     round_to_3 = csv_path.endswith("currency_daily.csv")
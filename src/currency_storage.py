@@ -42,21 +42,22 @@ except ImportError:
     )
 
 
-def save_raw_data(data: Dict[str, Any], output_dir: str = "data/forex_data/raw") -> str:
+def save_raw_data(data: Dict[str, Any], output_dir: str = "data/forex_data/raw", encoded: Optional[bytes] = None) -> str:
     """
     Save raw data to a JSON file.
     
     Args:
         data: The data dictionary to save
         output_dir: Directory to save the file
+        encoded: Optional pre-serialized JSON payload to write as-is
         
     Returns:
         Path to the saved file
     """
-    return save_raw_data_generic(data, output_dir, filename_prefix="aud_data")
+    return save_raw_data_generic(data, output_dir, filename_prefix="aud_data", encoded=encoded)
 
 
-def save_daily_data(data: Dict[str, Any], output_dir: str = "data/forex_data/processed") -> str:
+def save_daily_data(data: Dict[str, Any], output_dir: str = "data/forex_data/processed", encoded: Optional[bytes] = None) -> str:
     """
     Save daily data with date-based filename.
     Data is standardized before saving to ensure consistent format.
@@ -64,6 +65,7 @@ def save_daily_data(data: Dict[str, Any], output_dir: str = "data/forex_data/pro
     Args:
         data: The data dictionary to save
         output_dir: Directory to save the file
+        encoded: Optional pre-serialized JSON payload to write as-is
         
     Returns:
         Path to the saved file
@@ -72,7 +74,8 @@ def save_daily_data(data: Dict[str, Any], output_dir: str = "data/forex_data/pro
         data,
         output_dir,
         standardize_func=standardize_data,
-        filename_prefix="aud_daily"
+        filename_prefix="aud_daily",
+        encoded=encoded
     )
 
 
@@ -102,7 +105,7 @@ def load_latest_data(data_dir: str = "data/forex_data/processed") -> Optional[Di
     return load_latest_data_generic(data_dir, filename_pattern="aud_daily_*.json")
 
 
-def save_to_currency_table(data: Dict[str, Any], csv_path: str = "data/forex_data/processed/currency_daily.csv") -> str:
+def save_to_currency_table(data: Dict[str, Any], csv_path: str = "data/forex_data/processed/currency_daily.csv", already_standardized: bool = False) -> str:
     """
     Save currency data to the daily table (CSV).
     Each day is a new row with timestamps for daily tracking.
@@ -110,6 +113,7 @@ def save_to_currency_table(data: Dict[str, Any], csv_path: str = "data/forex_dat
     Args:
         data: Standardized data dictionary with currencies
         csv_path: Path to the daily currency CSV file
+        already_standardized: True if data came from the standardizer (skips standardizing again)
         
     Returns:
         Path to the saved CSV file
@@ -120,7 +124,7 @@ def save_to_currency_table(data: Dict[str, Any], csv_path: str = "data/forex_dat
     
     try:
         # Standardize data if needed
-        standardized_data = standardize_data(data)
+        standardized_data = data if already_standardized else standardize_data(data)
         
         # Extract date
         date_str = standardized_data.get("date") or datetime.now().strftime("%Y-%m-%d")
@@ -141,11 +145,11 @@ def save_to_currency_table(data: Dict[str, Any], csv_path: str = "data/forex_dat
         
         # Extract currency rates
         currencies = standardized_data.get("currencies", {})
-        usd_rate = currencies.get("USD", {}).get("rate") if currencies.get("USD") else None
-        eur_rate = currencies.get("EUR", {}).get("rate") if currencies.get("EUR") else None
-        cny_rate = currencies.get("CNY", {}).get("rate") if currencies.get("CNY") else None
-        sgd_rate = currencies.get("SGD", {}).get("rate") if currencies.get("SGD") else None
-        jpy_rate = currencies.get("JPY", {}).get("rate") if currencies.get("JPY") else None
+        usd_rate = (currencies.get("USD") or {}).get("rate")
+        eur_rate = (currencies.get("EUR") or {}).get("rate")
+        cny_rate = (currencies.get("CNY") or {}).get("rate")
+        sgd_rate = (currencies.get("SGD") or {}).get("rate")
+        jpy_rate = (currencies.get("JPY") or {}).get("rate")
         
         # Save to both CSV files
         csv_paths = [
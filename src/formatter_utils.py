@@ -5,9 +5,46 @@ Shared utilities for data formatting used by both currency and commodity formatt
 """
 
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
 
+@lru_cache(maxsize=1024)
+def parse_ymd(date_str: str) -> datetime:
+    """
+    Parse a YYYY-MM-DD date string to a datetime (midnight).
+    
+    Equivalent to datetime.strptime(date_str, "%Y-%m-%d") for valid dates, but
+    splits the string directly and caches results, since date-range runs parse
+    the same dates repeatedly.
+    
+    Args:
+        date_str: Date in YYYY-MM-DD format
+        
+    Returns:
+        datetime for the date
+        
+    Raises:
+        ValueError: If the string is not a valid YYYY-MM-DD date
+    """
+    year, month, day = date_str.split("-")
+    return datetime(int(year), int(month), int(day))
+
+
+@lru_cache(maxsize=64)
+def format_full_date(date_str: str) -> str:
+    """
+    Format a YYYY-MM-DD date for display, e.g. "January 05, 2025" (cached).
+    
+    Args:
+        date_str: Date in YYYY-MM-DD format
+        
+    Returns:
+        Date formatted as "%B %d, %Y"
+    """
+    return parse_ymd(date_str).strftime("%B %d, %Y")
+
+
 def extract_date_from_data(data: Dict[str, Any], data_key: str = "currencies") -> Optional[str]:
     """
     Extract date from data dictionary, handling various data structures.
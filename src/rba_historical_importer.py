@@ -11,7 +11,7 @@ import requests
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Sequence
 import time
 import os
 import sys
@@ -44,6 +44,10 @@ except ImportError:
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Standalone 3-letter codes in a column header, and codes that are not currencies
+_CURRENCY_CODE_RE = re.compile(r'\b[A-Z]{3}\b')
+_NON_CURRENCY_CODES = frozenset({'RBA', 'AUD', 'IMF', 'WM', 'FXR', 'TWI'})
+
 
 class RBAForexImporter:
     """Import historical AUD exchange rates from Reserve Bank of Australia"""
@@ -335,13 +339,10 @@ class RBAForexImporter:
         
         # Check if it's already a 3-letter code (extract from any part of the string)
         # Look for 3-letter uppercase codes
-        matches = re.findall(r'\b[A-Z]{3}\b', column_name.upper())
-        if matches:
+        for match in _CURRENCY_CODE_RE.findall(column_name.upper()):
             # Filter out common non-currency codes
-            non_currency = {'RBA', 'AUD', 'IMF', 'WM', 'FXR', 'TWI'}
-            for match in matches:
-                if match not in non_currency:
-                    return match
+            if match not in _NON_CURRENCY_CODES:
+                return match
         
         return None
     
@@ -475,6 +476,60 @@ class RBAForexImporter:
         
         return result[0] if result else None
     
+    def get_covered_range(self, base_currency: str = "AUD") -> Optional[Tuple[str, str]]:
+        """
+        Get the first and last dates with imported rates
+        
+        Dates inside this range without rows had no RBA data (weekends, holidays);
+        dates outside it have not been imported.
+        
+        Args:
+            base_currency: Base currency code (default: 'AUD')
+            
+        Returns:
+            Tuple of (first date, last date) in YYYY-MM-DD format, or None if nothing is imported
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT MIN(date), MAX(date) FROM exchange_rates WHERE base_currency = ?",
+                (base_currency,)
+            )
+            first, last = cursor.fetchone()
+        
+        return (first, last) if first and last else None
+    
+    def query_rates_batch(self, date: str, quote_currencies: Sequence[str],
+                          base_currency: str = "AUD") -> Dict[str, float]:
+        """
+        Query exchange rates for several currencies on one date in a single query
+        
+        Args:
+            date: Date in YYYY-MM-DD format
+            quote_currencies: Quote currency codes (e.g., ['USD', 'EUR'])
+            base_currency: Base currency code (default: 'AUD')
+            
+        Returns:
+            Dictionary mapping quote currency to rate (currencies without data are omitted)
+        """
+        if not quote_currencies:
+            return {}
+        
+        placeholders = ','.join('?' * len(quote_currencies))
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            
+            # Oldest first so the most recently imported rate wins (matches query_rate)
+            cursor.execute(f"""
+                SELECT quote_currency, rate FROM exchange_rates
+                WHERE date = ? AND base_currency = ? AND quote_currency IN ({placeholders})
+                ORDER BY created_at ASC
+            """, (date, base_currency, *quote_currencies))
+            
+            rows = cursor.fetchall()
+        
+        return dict(rows)
+    
     def get_date_range(self, start_date: str, end_date: str, quote_currency: str, 
                       base_currency: str = "AUD") -> pd.DataFrame:
         """
@@ -0,0 +1,49 @@
+"""Tests for the generic history CSV helpers."""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.base_history import load_history_csv_generic, upsert_history_row_generic
+
+COLUMNS = ("date", "timestamp", "rate")
+
+
+def _load(csv_path):
+    return load_history_csv_generic(csv_path, list(COLUMNS), ["rate"])
+
+
+def _upsert(csv_path, day, timestamp, rate):
+    return upsert_history_row_generic(
+        csv_path, day, COLUMNS, {"rate": rate, "timestamp": timestamp}, _load
+    )
+
+
+def test_appended_rows_keep_timestamps_after_reload(tmp_path):
+    csv_path = str(tmp_path / "history.csv")
+    _upsert(csv_path, datetime(2026, 1, 15), datetime(2026, 1, 15, 17, 0, 1, 123456, tzinfo=timezone.utc), 0.65)
+    # Later date takes the append fast path with a timestamp in a different precision
+    assert _upsert(csv_path, datetime(2026, 1, 16), datetime(2026, 1, 16, 17, 0, 2, tzinfo=timezone.utc), 0.66) is None
+
+    df = _load(csv_path)
+    assert len(df) == 2
+    assert df["timestamp"].notna().all()
+    assert df["timestamp"].iloc[1] == pd.Timestamp("2026-01-16 17:00:02", tz="UTC")
+
+
+def test_full_rewrite_after_append_keeps_timestamps(tmp_path):
+    csv_path = str(tmp_path / "history.csv")
+    _upsert(csv_path, datetime(2026, 1, 15), datetime(2026, 1, 15, 17, 0, 1, 123456, tzinfo=timezone.utc), 0.65)
+    _upsert(csv_path, datetime(2026, 1, 17), datetime(2026, 1, 17, 17, 0, 3, tzinfo=timezone.utc), 0.67)
+    # Earlier date forces a full load and rewrite of the file
+    df = _upsert(csv_path, datetime(2026, 1, 16), datetime(2026, 1, 16, 17, 0, 2, tzinfo=timezone.utc), 0.66)
+    assert df is not None
+
+    reloaded = _load(csv_path)
+    assert [str(d) for d in reloaded["date"]] == ["2026-01-15", "2026-01-16", "2026-01-17"]
+    assert reloaded["timestamp"].notna().all()
+    assert list(reloaded["rate"]) == [0.65, 0.66, 0.67]